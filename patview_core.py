@@ -0,0 +1,2129 @@
+"""
+Patview core: msi parsing, caches, folder index, scanning and Atoll export.
+Imports no tkinter, so batch jobs start fast.
+"""
+import pathlib
+import sys
+import re
+import os
+import math
+import collections
+import sqlite3
+import threading
+import queue
+import concurrent.futures
+import multiprocessing
+import functools
+import hashlib
+import json
+import time
+import shutil
+import ctypes
+import ctypes.util
+import select
+import struct
+import numpy as np
+
+# ----------- Globals ----------------------
+class Settings:
+
+    # bandname, letter, fmin_sr, fmax_sr, fmin_all, fmax_all, hsl
+    bands = [
+        ['0700', 'S', 743,    773,     738,  788, (  0, 100, 40)],
+        ['0800', 'L', 791,    801,     791,  821, ( 30, 100, 40)],
+        ['0900', 'G', 930.1,  945.1,   925,  960, ( 60, 100, 40)],
+        ['1400', 'V', 1452,   1467,   1428, 1511, ( 90, 100, 40)],
+        ['1800', 'D', 1860.1, 1879.9, 1805, 1880, (120, 100, 40)],
+        ['2100', 'U', 2110.5, 2120.3, 2110, 2170, (150, 100, 40)],
+        ['2600', 'E', 2620,   2645,   2594, 2690, (180, 100, 40)],
+        ['3500', 'Z', 3540,   3585,   3400, 3600, (210, 100, 40)],
+        ['3600', 'Z', 3700,   3800,   3600, 3800, (240, 100, 40)]
+    ]
+
+    std_freqs = [
+        738, 746, 757, 768, 777, 788,
+        791, 798, 803, 807, 814, 821,
+        925, 943, 960,
+        1428, 1450, 1463, 1475, 1496, 1511,
+        1805, 1830, 1845, 1859, 1880,
+        2110, 2140, 2170,
+        2594, 2622, 2658, 2665, 2690,
+        3400, 3433, 3467, 3500, 3533, 3567, 3600,
+        3600, 3633, 3667, 3700, 3733, 3767, 3800
+    ]
+
+
+
+    pattern_colors = ['#000', '#f00', '#090', '#00f', '#990', '#099', '#f0f']
+    max_vector_patterns = 50 # more patterns are rasterized into one image
+    raster_chunk = 500 # cuts rasterized at once, bounds the memory use
+    lod_cache_entries = 4000 # decimated cuts kept, at least all cuts of the shown scene
+    freq_axis = (700, 3810) # MHz range of the frequency view
+    grid_step = 1 # degrees of the shared angle grid the cuts are resampled to for comparisons and metrics
+
+    extract_freq_from_filename_re = r'.+_(\d{3,4})(_|\.|MHz)'
+    extract_tilt_from_filename_res = [r'.+_(\d\d)T', r'.+_(-\d)T', r'.+[_-](\d\d)FD']
+    atoll_passive_import_file = r'C:\test\atoll_import_passive.txt'
+    atoll_active_import_models = r'C:\test\atoll_import_models.txt'
+    atoll_active_import_patterns = r'C:\test\atoll_import_patterns.txt'
+
+    band_tolerance = 5 # Gives a band letter if not exact inside
+
+    compare_tolerance = 1.0 # dB, largest deviation of a passing A-B pair
+    compare_export_file = r'C:\test\pattern_compare.txt'
+
+    export_workers = os.cpu_count() or 4 # processes for Atoll exports
+    export_parallel_min = 20 # smaller exports run on threads, a process pool is not worth starting
+    export_window = 64 # files in flight, bounds the memory of an export
+    compile_step_files = 500 # files a library compile handles per step, keeps the gui responsive
+
+    msi_cache_max_entries = 5000 # parsed msi files kept in memory
+    msi_cache_max_bytes = 256 * 1024 * 1024
+
+    index_file = pathlib.Path.home() / '.patview' / 'index.sqlite' # persistent metadata of seen msi files
+    archive_dir = pathlib.Path.home() / '.patview' / 'archives' # compiled pattern libraries
+    archive_check_s = 2 # how often loading looks for new compiled libraries
+
+    scan_workers = 4 # threads for folder scanning
+    scan_batch_size = 200 # files per batch sent to the file list
+    scan_poll_ms = 100 # how often the gui picks up scan results
+    header_workers = 8 # threads reading msi headers for the table view
+    search_workers = 8 # threads listing folders for a subtree search
+    search_max_depth = 10 # default folder levels below the search root
+
+    dedup_grid_step = 5 # degrees of the cuts compared for near duplicates
+    dedup_quantum = 1.0 # dB, near duplicates are equal after rounding to this
+    dedup_chunk = 64 # files per task sent to a fingerprint process
+
+    watch_poll_ms = 500 # how often the gui picks up folder changes
+    watch_poll_s = 2 # folders are listed this often where inotify is not available
+    watch_max_folders = 50 # watched folders, the least recently shown are dropped
+
+    filter_delay_ms = 250 # wait for a typing pause before filtering
+    filter_lazy_chunk = 200 # files read per batch for vendor: and metric terms, a cancel is seen between batches
+
+    virtual_list_threshold = 2000 # longer file lists only create the rows in view
+    virtual_list_buffer = 2 # extra rows below the view
+
+# ------- Utility functions -------
+class Helper:
+    def hsl(h, s=100, l=50):
+        """
+        Convert HSL color to RGB hex format (#ffffff).
+        h: Hue [0, 360)
+        s: Saturation [0, 100]
+        l: Lightness [0, 100]
+        Returns: Hex color string
+        """
+        s /= 100
+        l /= 100
+
+        c = (1 - abs(2 * l - 1)) * s  # Chroma
+        x = c * (1 - abs((h / 60) % 2 - 1))
+        m = l - c/2
+
+        if 0 <= h < 60:
+            r_, g_, b_ = c, x, 0
+        elif 60 <= h < 120:
+            r_, g_, b_ = x, c, 0
+        elif 120 <= h < 180:
+            r_, g_, b_ = 0, c, x
+        elif 180 <= h < 240:
+            r_, g_, b_ = 0, x, c
+        elif 240 <= h < 300:
+            r_, g_, b_ = x, 0, c
+        elif 300 <= h < 360:
+            r_, g_, b_ = c, 0, x
+        else:
+            r_, g_, b_ = 0, 0, 0
+
+        r = round((r_ + m) * 255)
+        g = round((g_ + m) * 255)
+        b = round((b_ + m) * 255)
+
+        return f'#{r:02x}{g:02x}{b:02x}'
+    
+
+    def calc_band(f):
+        """band row of Settings.bands for frequency f, [] if there is none"""
+        i = band_index.classify([float(f)])[0]
+        return Settings.bands[i] if i >= 0 else []
+
+    process_pool = None # shared by the cpu bound batch jobs, started on first use
+
+    def get_process_pool():
+        if Helper.process_pool is None:
+            # spawned, not forked: a fork would copy locks held by the scan and watcher threads
+            Helper.process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=Settings.export_workers,
+                                                                         mp_context=multiprocessing.get_context('spawn'))
+        return Helper.process_pool
+
+    # precompiled line patterns of the msi format
+    flag_re = re.compile(r'([A-Z]+)\s+(.*)')
+    pair_re = re.compile(r'([\d\.]+)\s(-?[\d\.]+)')
+    header_max_lines = 50
+
+    def read_msi(msi_path):
+        """
+        Read a msi file in one pass.
+        Returns a dict with the header flags (NAME, GAIN, ...), 'vendor',
+        the raw 'header' lines up to HORIZONTAL and both cuts.
+        """
+        with open(msi_path, encoding='latin1') as fin:
+            lines = fin.readlines()
+
+        dic = {'path': str(msi_path), 'vendor': '', 'header': []}
+        header = dic['header']
+        mode = ''
+        hori = []
+        vert = []
+        for raw_line in lines:
+            if mode == '' and len(header) < Helper.header_max_lines:
+                header.append(raw_line)
+                lower = raw_line.lower()
+                if "huawei" in lower:
+                    dic['vendor'] = "Huawei"
+                elif "broadradio" in lower:
+                    dic['vendor'] = "Broadradio"
+
+            line = raw_line.strip()
+            if line == '':
+                continue
+
+            if line.startswith('HORIZONTAL'):
+                mode = 'horizontal'
+                continue
+
+            if line.startswith('VERTICAL'):
+                mode = 'vertical'
+                continue
+
+            first = line[0]
+            if first.isdigit() or first == '.':
+                r = Helper.pair_re.match(line)
+                if r:
+                    pair = (float(r.group(1)), float(r.group(2)))
+                    if mode == 'horizontal':
+                        hori.append(pair)
+                    elif mode == 'vertical':
+                        vert.append(pair)
+                    else:
+                        assert 0, 'ERROR'
+                continue
+
+            r = Helper.flag_re.match(line)
+            if r:
+                dic[r.group(1)] = r.group(2)
+
+        # cuts as contiguous (N, 2) float arrays of angle, gain
+        dic['HORIZONTAL'] = np.array(hori, dtype=float).reshape(-1, 2)
+        dic['VERTICAL'] = np.array(vert, dtype=float).reshape(-1, 2)
+
+        return dic
+
+    def load_msi(msi_path):
+        """
+        read_msi through the parse cache, the file is only read again if mtime or size changed.
+        Files of a compiled library are taken from its archive without parsing.
+        """
+        return msi_cache.get(msi_path)
+
+    def cut2xy(cut, x0, y0, r0, dynamic=30):
+        """
+        Convert a (N, 2) cut of angle, gain to (N, 2) canvas points around x0, y0.
+        The gain is clamped to the dynamic range and mapped to radius r0 at 0 dB.
+        """
+        rad = np.radians(cut[:, 0])
+        r = r0 / dynamic * np.clip(dynamic - cut[:, 1], 0, None)
+        xy = np.empty((len(cut), 2))
+        xy[:, 0] = r * np.cos(rad) + x0
+        xy[:, 1] = r * np.sin(rad) + y0
+        return xy
+
+    def cut2canvas(cut, x0, y0, r0, dynamic=30):
+        """cut2xy as flat canvas coordinates x1, y1, x2, y2, ..."""
+        return Helper.cut2xy(cut, x0, y0, r0, dynamic).ravel().tolist()
+
+    def lod_buckets(r0):
+        """
+        Angular buckets for a polar plot of radius r0: one per about 4 pixels of circumference,
+        each keeps 2 samples. Powers of 2, so close sizes share the decimated cuts.
+        """
+        circumference = max(2 * math.pi * r0, 64)
+        return 2 ** math.floor(math.log2(circumference / 4))
+
+    def decimate_cut(cut, nbuckets):
+        """
+        Reduce a (N, 2) cut to the lowest and highest gain sample of every angular bucket.
+        Peaks and nulls are kept, the samples stay in their order.
+        """
+        if len(cut) <= 2 * nbuckets:
+            return cut
+        bucket = (cut[:, 0] % 360 * (nbuckets / 360)).astype(np.int64)
+        order = np.lexsort((cut[:, 1], bucket)) # by bucket, then gain
+        sorted_bucket = bucket[order]
+        edge = sorted_bucket[1:] != sorted_bucket[:-1]
+        keep = np.zeros(len(cut), dtype=bool)
+        keep[order[np.r_[True, edge]]] = True # lowest gain of each bucket
+        keep[order[np.r_[edge, True]]] = True # highest gain of each bucket
+        return cut[keep]
+
+    def rasterize(polygons, width, height):
+        """
+        Count for every pixel of a width x height image how many of the closed
+        polygons ((N, 2) point arrays) pass through it.
+        The cost grows with the drawn pixels, not with the number of polygons.
+        """
+        npix = width * height
+        counts = np.zeros(npix, dtype=np.int64)
+        polygons = [xy for xy in polygons if len(xy) >= 2]
+
+        for c in range(0, len(polygons), Settings.raster_chunk):
+            chunk = polygons[c:c + Settings.raster_chunk]
+            sizes = np.array([len(xy) for xy in chunk])
+            starts = np.concatenate(chunk)
+            ids = np.repeat(np.arange(len(chunk)), sizes)
+
+            # segment ends: next point, the last point closes to the first of its polygon
+            nxt = np.arange(1, len(starts) + 1)
+            last = np.cumsum(sizes) - 1
+            nxt[last] = last - sizes + 1
+            delta = starts[nxt] - starts
+
+            # sample every segment about once per pixel, its end is the start of the next one
+            nseg = np.maximum(np.ceil(np.abs(delta).max(axis=1)).astype(np.int64), 1)
+            seg = np.repeat(np.arange(len(starts)), nseg)
+            t = (np.arange(len(seg)) - np.repeat(np.cumsum(nseg) - nseg, nseg)) / np.repeat(nseg, nseg)
+            x = (starts[seg, 0] + t * delta[seg, 0]).astype(np.int64)
+            y = (starts[seg, 1] + t * delta[seg, 1]).astype(np.int64)
+
+            inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            pix = y[inside] * width + x[inside]
+            owner = ids[seg[inside]]
+
+            # a polygon counts once per pixel, also where its outline comes back to a pixel.
+            # Most repeats follow each other, dropping them first makes the unique cheaper
+            new = np.ones(len(pix), dtype=bool)
+            new[1:] = (pix[1:] != pix[:-1]) | (owner[1:] != owner[:-1])
+            keys = np.sort(owner[new] * npix + pix[new])
+            first = np.ones(len(keys), dtype=bool)
+            first[1:] = keys[1:] != keys[:-1]
+            counts += np.bincount(keys[first] % npix, minlength=npix)
+
+        return counts.reshape(height, width)
+
+    def hex2rgb(color):
+        """'#rgb' or '#rrggbb' to (r, g, b)"""
+        color = color.lstrip('#')
+        if len(color) == 3:
+            color = ''.join(c * 2 for c in color)
+        return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+    def raster2ppm(counts, background, density):
+        """
+        Binary PPM image of a rasterize result for tk.PhotoImage.
+        density: color by count from blue (few) to red (many), else black where count > 0
+        """
+        height, width = counts.shape
+        rgb = np.empty((height, width, 3), dtype=np.uint8)
+        rgb[:] = background
+        hit = counts > 0
+        if density:
+            palette = np.array([Helper.hex2rgb(Helper.hsl(240 * (1 - i / 255), 100, 45)) for i in range(256)], dtype=np.uint8)
+            level = np.log1p(counts[hit]) / np.log1p(max(counts.max(), 1))
+            rgb[hit] = palette[(level * 255).astype(int)]
+        else:
+            rgb[hit] = 0
+        return f'P6 {width} {height} 255 '.encode() + rgb.tobytes()
+
+    def is_dir(path):
+        return os.path.isdir(path)
+
+    def list_msis(folder):
+        """msi files in folder, sorted by name"""
+        with os.scandir(folder) as it:
+            names = sorted(entry.name for entry in it if entry.name.lower().endswith('.msi') and entry.is_file())
+        return [str(pathlib.Path(folder) / name) for name in names]
+
+    def load_msis(files):
+        """load_msi of many files, read in parallel"""
+        return list(FolderIndex.pool.map(Helper.load_msi, files))
+
+    def pairs2atoll(pairs_hori, pairs_vert):
+        """convert the horizontal and vertical cut to an atoll importable string"""
+        parts = ['2 0 0 360']
+        parts += Helper.cut2atoll_parts(pairs_hori)
+        parts.append('1 0 360')
+        parts += Helper.cut2atoll_parts(pairs_vert)
+        return ' '.join(parts)
+
+    def cut2atoll_parts(cut):
+        """'deg gain' strings of a (N, 2) cut, degrees truncated to int, gain rounded to 2 digits"""
+        cut = np.asarray(cut, dtype=float).reshape(-1, 2)
+        degs = cut[:, 0].astype(int).tolist()
+        gains = cut[:, 1].tolist()
+        return [f'{deg} {round(gain, 2)}' for deg, gain in zip(degs, gains)]
+
+    def calc_gain(s):
+        try:
+            l = s.split()
+            value = l[0]
+            unit = l[1]
+
+            if unit == 'dBd':
+                add = 2.15
+            elif unit == 'dBi':
+                add = 0
+            else:
+                assert 'cant calc gain'
+
+            return round(float(value) + add, 2)
+        except:
+            return ''
+
+    def calc_tilt(s):
+        s = s.strip()
+        if s == '':
+            return 0
+        return int(s)
+
+    def is_valid_regex(sreg):
+        try:
+            re.compile(sreg)
+            return True
+        except re.error:
+            return False
+
+    def sort_key(value):
+        """typed sort key: numbers by value ("800" < "1800"), then text, placeholders like '-' last"""
+        if isinstance(value, (int, float)):
+            return (0, value, '')
+        try:
+            return (0, float(value), '')
+        except (TypeError, ValueError):
+            value = str(value)
+            return (2 if value in ('', '-') else 1, 0, value)
+
+    def to_number(s):
+        """float of a filename field, nan for placeholders like '-'"""
+        try:
+            return float(s)
+        except (TypeError, ValueError):
+            return math.nan
+    
+    atoll_passive_columns = "Name\tGain\tManufacturer\tComments\tELECTRICAL_TILT\tPhysical Antenna\tMin Frequency (MHz)\tMax Frequency (MHz)\tSR_ANTENNA_NAME\tFREQUENCY\tTILT\tSR_BAND\tSR_POLARIZATION\tPattern\n"
+    atoll_active_columns1 = "Name\tMin Frequency (MHz)\tMax Frequency (MHz)\tPolarisation\tComments\tPHYSICAL_ANTENNA\tFREQUENCY\tELECTRICAL_TILT\tSR_ANTENNA_NAME\n"
+    atoll_active_columns2 = "Beamforming Model\tBeam Index\tActive\tBeam type\tPattern Electrical Tilt (°)\tBoresight Gain (dBi)\tPattern\n"
+
+    def passive_atoll_row(file, ant_title):
+        """one line of the passive atoll import for file"""
+        msi = Helper.load_msi(file)
+        file_info = Helper.inspect_msi(file, deep=True, msi=msi)
+        atoll_str = Helper.pairs2atoll(msi['HORIZONTAL'], msi['VERTICAL'])
+
+        freq = float(file_info['freq'])
+
+        band = Helper.calc_band(freq)
+        if not band:
+            raise ValueError(f'no band for frequency {freq}')
+        letter = band[1]
+        tilt_str = str(Helper.calc_tilt(file_info['tilt'])).zfill(2)
+
+        Name = ant_title + '_' + letter + '_T' + tilt_str
+
+        Gain = file_info['gain']
+        Manufacturer = file_info['vendor']
+        Comments = pathlib.Path(file_info['file'])
+        ELECTRICAL_TILT = file_info['tilt']
+        Physical_Antenna = ant_title
+        Min_Frequency = band[4]
+        Max_Frequency = band[5]
+        SR_ANTENNA_NAME = ant_title
+        FREQUENCY = file_info['bandname']
+        TILT = file_info['tilt']
+        SR_BAND = file_info['letter']
+        SR_POLARIZATION = 'X'
+        Pattern = atoll_str
+        return f'{Name}\t{Gain}\t{Manufacturer}\t{Comments}\t{ELECTRICAL_TILT}\t{Physical_Antenna}\t{Min_Frequency}\t{Max_Frequency}\t{SR_ANTENNA_NAME}\t{FREQUENCY}\t{TILT}\t{SR_BAND}\t{SR_POLARIZATION}\t{Pattern}\n'
+
+    def make_passive_atoll(files):
+        """write the passive atoll import next to the files, returns the finished AtollExport"""
+        return AtollExport('passive', files).run()
+
+    def active_atoll_rows(file):
+        """the model line and the pattern line of the active atoll import for file"""
+        msi = Helper.load_msi(file)
+        file_info = Helper.inspect_msi(file, deep=True, msi=msi)
+        filename = file_info['file']
+        antenna_name = file_info['antenna_name']
+        freq = file_info['freq']
+        band = Helper.calc_band(freq)
+        if not band:
+            raise ValueError(f'no band for frequency {freq}')
+        FREQUENCY = band[4]
+        Min_Frequency = band[4]
+        Max_Frequency = band[5]
+        letter = band[1]
+        tilt = file_info['tilt']
+        tilt_str = str(Helper.calc_tilt(file_info['tilt'])).zfill(2)
+
+        Name = antenna_name + letter +  '_X' + '_T' + tilt_str
+        gain = file_info['gain']
+
+        atoll_str = Helper.pairs2atoll(msi['HORIZONTAL'], msi['VERTICAL'])
+
+        row1 = f'{Name}\t{Min_Frequency}\t{Max_Frequency}\tX\t{filename}\t{antenna_name}\t{FREQUENCY}\t{tilt}\t{antenna_name}\n'
+        row2 = f'{Name}\t0\tTRUE\tAll\t{tilt}\t{gain}\t{atoll_str}\n'
+        return row1, row2
+
+    def make_active_atoll(files):
+        """write the active atoll import files, returns the finished AtollExport"""
+        return AtollExport('active', files).run()
+
+    def inspect_msi(full_path, deep, msi=None):
+        """file info from the filename, with deep=True also from the header (msi: already read file)"""
+        if not full_path.lower().endswith('.msi'):
+            return
+        file_name = pathlib.Path(full_path).name
+
+        dic = {
+            'path' : full_path,
+            'file' : file_name,
+            'antenna_name' : Helper.extract_antenna_name(file_name),
+            'freq' : Helper.extract_freq_from_filename(file_name),
+            'tilt' : Helper.extract_tilt_from_filename(file_name)
+        }
+
+        if deep == True:
+            if msi is None:
+                msi = Helper.load_msi(full_path)
+
+            dic['vendor'] = msi['vendor']
+            dic['gain'] = ''
+            if 'GAIN' in msi:
+                dic['gain'] = Helper.calc_gain(msi['GAIN'].rstrip('GAIN').strip())
+            if 'NAME' in msi:
+                dic['antenna_name'] = msi['NAME'].rstrip('NAME').strip()
+
+            band = Helper.calc_band(dic['freq']) if dic['freq'].isdigit() else []
+            if len(band) > 0:
+                bandname, letter, fmin_sr, fmax_sr, fmin_all, fmax_all, hsl = band
+            else:
+                bandname, letter, fmin_sr, fmax_sr, fmin_all, fmax_all, hsl = ['','','','','','','']
+
+            dic['bandname'] = bandname
+            dic['letter'] = letter
+
+        return dic
+
+    def inspect_msis(files, deep):
+        res = []
+        for full_path in files:
+            file_info = Helper.inspect_msi(full_path, deep=deep)
+            if not file_info:
+                continue
+            res.append(file_info)
+        return res    
+    
+    def extract_tilt_from_filename(filename):
+        for match_str in Settings.extract_tilt_from_filename_res:
+
+            r = re.match(match_str, filename)
+            if r:
+                return r.group(1)
+        print('could not extract tilt', file=sys.stderr)
+        return '-'
+    
+    def extract_antenna_name(s):
+        ant_name = s.split('_')[0]
+        ant_name = ant_name[:-1] + ant_name[-1].lower() # lower last letter
+        return ant_name
+
+        
+    def extract_freq_from_filename(filename):
+        r = re.match(Settings.extract_freq_from_filename_re, filename)
+        if r:
+            return r.group(1)
+        else:
+            return '-'
+    
+# ------- Band index -------
+class BandIndex:
+    """
+    Sorted interval index of the bands, fmin_all..fmax_all widened by the tolerance.
+    Bounds are inclusive, where bands overlap the first band wins like in a linear scan.
+    The band colors are computed once.
+    """
+    def __init__(self, bands, tolerance):
+        self.bands = bands
+        self.colors = [Helper.hsl(*band[6]) for band in bands]
+        self.light_colors = [Helper.hsl(band[6][0], band[6][1], 80) for band in bands]
+        self.letters = [band[1] for band in bands] + [''] # index -1 gives ''
+
+        # the band edges split the axis into edge points and open gaps between them,
+        # each is owned by the first band containing it
+        lo = np.array([band[4] - tolerance for band in bands], dtype=float)
+        hi = np.array([band[5] + tolerance for band in bands], dtype=float)
+        self.edges = np.unique(np.concatenate([lo, hi]))
+        mids = (self.edges[:-1] + self.edges[1:]) / 2
+        self.point_owner = BandIndex.first_owner(self.edges, lo, hi)
+        self.gap_owner = BandIndex.first_owner(mids, lo, hi)
+
+    def first_owner(points, lo, hi):
+        """index of the first interval containing each point, -1 for none"""
+        inside = (lo[None, :] <= points[:, None]) & (points[:, None] <= hi[None, :])
+        return np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+
+    def classify(self, freqs):
+        """band indices of an array of frequencies, -1 outside all bands or for nan"""
+        freqs = np.asarray(freqs, dtype=float)
+        edges = self.edges
+        i = np.searchsorted(edges, freqs)
+        clipped = np.minimum(i, len(edges) - 1)
+        on_edge = (i < len(edges)) & (edges[clipped] == freqs)
+        in_gap = (i > 0) & (i < len(edges))
+        res = np.full(freqs.shape, -1)
+        res[in_gap] = self.gap_owner[i[in_gap] - 1]
+        res[on_edge] = self.point_owner[i[on_edge]]
+        return res
+
+band_index = BandIndex(Settings.bands, Settings.band_tolerance)
+
+class FreqHistogram:
+    """
+    Number of files per frequency bin between fmin and fmax and per band, for the frequency view.
+    Frequencies that are nan are counted as unknown, the others outside the range as outside.
+    """
+    def __init__(self, freqs, fmin, fmax, bins):
+        self.fmin, self.fmax, self.bins = fmin, fmax, bins
+        freqs = np.asarray(freqs, dtype=float)
+        known = freqs[~np.isnan(freqs)]
+        self.unknown = len(freqs) - len(known)
+        i = self.bin(known)
+        inside = i >= 0
+        self.counts = np.bincount(i[inside], minlength=bins)
+        self.outside = len(known) - int(inside.sum())
+        # index -1 (no band) is shifted to 0 and dropped
+        self.band_counts = np.bincount(band_index.classify(known) + 1, minlength=len(band_index.bands) + 1)[1:]
+
+    def bin(self, freqs):
+        """bin indices of an array of frequencies, -1 outside the range"""
+        i = np.floor((np.asarray(freqs, dtype=float) - self.fmin) / (self.fmax - self.fmin) * self.bins).astype(int)
+        return np.where((i >= 0) & (i < self.bins), i, -1)
+
+    def count_at(self, f):
+        i = int(self.bin([f])[0])
+        return int(self.counts[i]) if i >= 0 else 0
+
+# ------- Shared angle grid -------
+class PatternGrid:
+    """
+    Cuts resampled to a shared angle grid, linear between the samples and wrapping at 360,
+    so files with 1, 0.5 degree or irregular steps can be stacked into (files, angles) matrices.
+    The resampled cuts are cached in the parsed msi dicts of msi_cache, per cut and step.
+    """
+    cuts = ('HORIZONTAL', 'VERTICAL')
+
+    def angles(step=Settings.grid_step):
+        return np.arange(0, 360, step, dtype=float)
+
+    def resample(cut, angles):
+        """gain of cut at angles, nan for a cut without samples"""
+        if len(cut) == 0:
+            return np.full(len(angles), np.nan)
+        return np.interp(angles, cut[:, 0], cut[:, 1], period=360)
+
+    def cut_on_grid(msi, cut, step=Settings.grid_step):
+        """cached resampled cut of msi"""
+        key = ('grid', cut, step)
+        grid_cut = msi.get(key)
+        if grid_cut is None:
+            grid_cut = PatternGrid.resample(msi[cut], PatternGrid.angles(step))
+            grid_cut.setflags(write=False) # shared like the cut
+            msi_cache.add_derived(msi, key, grid_cut)
+        return grid_cut
+
+    def matrix(msis, cut, step=Settings.grid_step):
+        """(files, angles) matrix of one cut of msis"""
+        n = len(PatternGrid.angles(step))
+        return np.array([PatternGrid.cut_on_grid(msi, cut, step) for msi in msis]).reshape(len(msis), n)
+
+    def load(files):
+        """parsed msi per file in parallel, an error message instead for files that cannot be read"""
+        return list(FolderIndex.pool.map(PatternGrid.try_load, files))
+
+    def try_load(path):
+        try:
+            return Helper.load_msi(path)
+        except Exception as e:
+            return f'{type(e).__name__}: {e}'
+
+# ------- RF metrics -------
+class RfMetrics:
+    """
+    RF metrics of many msi files at once, computed on the PatternGrid matrices of the cuts
+    rotated so the peak is in the middle. Gains are attenuations in dB below the peak.
+      hpbw_h, hpbw_v  half power beamwidth in degrees
+      fb              front to back ratio, strongest lobe within +-30 degrees of the back
+      peak_h, peak_v  peak direction in degrees, signed (peak_v is the tilt)
+      sidelobe        first upper sidelobe of the vertical cut
+      null_fill       first null below the vertical main beam
+    The metrics are cached in the parsed msi dicts of msi_cache.
+    """
+    columns = ('hpbw_h', 'hpbw_v', 'fb', 'peak_h', 'peak_v', 'sidelobe', 'null_fill')
+    fb_sector = 30
+    lobe_range = 90 # degrees from the peak searched for the first null and sidelobe
+
+    def of_msis(msis):
+        """metrics dict per msi, computed in one batch for the msis without cached metrics"""
+        step = Settings.grid_step
+        key = ('metrics', step)
+        missing = [msi for msi in msis if key not in msi]
+        if missing:
+            hori = PatternGrid.matrix(missing, 'HORIZONTAL', step)
+            vert = PatternGrid.matrix(missing, 'VERTICAL', step)
+            metrics = RfMetrics.compute(hori, vert, step)
+            for i, msi in enumerate(missing):
+                msi_cache.add_derived(msi, key, {column: round(float(metrics[column][i]), 1) for column in RfMetrics.columns})
+        return [msi[key] for msi in msis]
+
+    def of_files(files):
+        """metrics dict per file, nan metrics for files that cannot be read"""
+        msis = PatternGrid.load(files)
+        metrics = iter(RfMetrics.of_msis([msi for msi in msis if not isinstance(msi, str)]))
+        failed = dict.fromkeys(RfMetrics.columns, math.nan)
+        return [failed if isinstance(msi, str) else next(metrics) for msi in msis]
+
+    def compute(hori, vert, step):
+        """metric arrays of (files, angles) matrices of the cuts on a grid of step degrees"""
+        H, peak_h = RfMetrics.centered(hori)
+        V, peak_v = RfMetrics.centered(vert)
+        c = H.shape[1] // 2
+        offsets = (np.arange(H.shape[1]) - c) * step
+        back = np.abs(offsets) >= 180 - RfMetrics.fb_sector
+
+        # upper side of the vertical cut are the decreasing angles
+        n_lobe = int(RfMetrics.lobe_range / step) + 1
+        upper = V[:, c::-1][:, :n_lobe]
+        lower = V[:, c:][:, :n_lobe]
+        null_upper, sidelobe = RfMetrics.first_lobe(upper)
+        null_lower, _ = RfMetrics.first_lobe(lower)
+
+        return {
+            'hpbw_h': (RfMetrics.half_width(H[:, c:]) + RfMetrics.half_width(H[:, c::-1])) * step,
+            'hpbw_v': (RfMetrics.half_width(V[:, c:]) + RfMetrics.half_width(V[:, c::-1])) * step,
+            'fb': H[:, back].min(axis=1) if H.shape[1] else np.zeros(0),
+            'peak_h': (peak_h * step + 180) % 360 - 180,
+            'peak_v': (peak_v * step + 180) % 360 - 180,
+            'sidelobe': sidelobe,
+            'null_fill': null_lower,
+        }
+
+    def centered(cuts):
+        """cuts normalized to their peak and rotated to have it in the middle, and the peak indices"""
+        cuts = cuts - cuts.min(axis=1, keepdims=True)
+        peak = cuts.argmin(axis=1)
+        n = cuts.shape[1]
+        index = (peak[:, None] + np.arange(n)[None, :] - n // 2) % n
+        return np.take_along_axis(cuts, index, axis=1), peak
+
+    def half_width(side, level=3):
+        """grid steps from the peak (column 0) to the first crossing of level, linear between samples, nan if none"""
+        above = side >= level
+        k = np.maximum(above.argmax(axis=1), 1)
+        rows = np.arange(len(side))
+        lo = side[rows, k - 1]
+        hi = side[rows, k]
+        frac = (level - lo) / np.where(hi > lo, hi - lo, 1)
+        return np.where(above.any(axis=1), k - 1 + frac, np.nan)
+
+    def first_lobe(side):
+        """levels of the first null and the first sidelobe behind it, going away from the peak (column 0)"""
+        d = np.diff(side, axis=1)
+        rows = np.arange(len(side))
+        falling = d < 0
+        k_null = falling.argmax(axis=1) # first local maximum of the attenuation
+        rising = (d > 0) & (np.arange(d.shape[1])[None, :] > k_null[:, None])
+        k_lobe = rising.argmax(axis=1) # next local minimum
+        null = np.where(falling.any(axis=1), side[rows, k_null], np.nan)
+        lobe = np.where(falling.any(axis=1) & rising.any(axis=1), side[rows, k_lobe], np.nan)
+        return null, lobe
+
+# ------- Parse cache -------
+class MsiCache:
+    """
+    LRU cache of read_msi results.
+    Entries are validated by mtime and size and evicted by count and byte budget.
+    """
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict() # path -> (mtime, size, msi, nbytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock() # files are also loaded from worker threads
+
+    def get(self, msi_path):
+        path = str(msi_path)
+        st = os.stat(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self.hits += 1
+                self.entries.move_to_end(path)
+                return entry[2]
+            self.misses += 1
+
+        msi = PatternArchive.lookup(path, st.st_mtime_ns, st.st_size) or Helper.read_msi(path)
+        for cut in ('HORIZONTAL', 'VERTICAL'):
+            msi[cut].setflags(write=False) # shared between callers
+        self.put(path, st.st_mtime_ns, st.st_size, msi)
+        return msi
+
+    def put(self, path, mtime, size, msi):
+        nbytes = MsiCache.estimate_size(msi)
+        with self.lock:
+            self.discard(path)
+            self.entries[path] = (mtime, size, msi, nbytes)
+            self.nbytes += nbytes
+            self.evict()
+
+    def add_derived(self, msi, key, value):
+        """store data computed from msi (resampled cuts, metrics) in it, its cache entry grows by the size"""
+        nbytes = MsiCache.estimate_size({key: value}) - MsiCache.estimate_size({})
+        with self.lock:
+            if key in msi:
+                return
+            msi[key] = value
+            entry = self.entries.get(msi['path'])
+            if entry and entry[2] is msi:
+                self.entries[msi['path']] = entry[:3] + (entry[3] + nbytes,)
+                self.nbytes += nbytes
+                self.evict()
+
+    def evict(self):
+        """drop the least recently used entries over the limits, call with the lock held"""
+        while self.entries and (len(self.entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, entry = self.entries.popitem(last=False)
+            self.nbytes -= entry[3]
+
+    def discard(self, path):
+        with self.lock:
+            entry = self.entries.pop(str(path), None)
+            if entry:
+                self.nbytes -= entry[3]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def estimate_size(msi):
+        size = 500 # dict overhead
+        for key, value in msi.items():
+            if isinstance(value, np.ndarray):
+                size += value.nbytes
+            elif isinstance(value, list):
+                size += sum(len(line) + 50 for line in value)
+            else:
+                size += len(key) + len(str(value)) + 100
+        return size
+
+    def stats(self):
+        return f'cache entries:{len(self.entries)} MB:{self.nbytes / 2**20:.1f} hits:{self.hits} misses:{self.misses}'
+
+msi_cache = MsiCache(Settings.msi_cache_max_entries, Settings.msi_cache_max_bytes)
+
+# ------- Compiled libraries -------
+class PatternArchive:
+    """
+    Binary archive of the msi files of a folder tree, made by LibraryCompile.
+    Per generation folder: cuts.f64, all cuts as one float64 block of (angle, gain) rows,
+    text.bin, the vendor, header lines and flags of each file as utf-8 json, and meta.npz,
+    the columns path, mtime, size and offset/length into both blocks.
+    The blocks are opened with np.memmap, cuts are read-only views into them.
+    The cuts keep the float64 values of read_msi, so exports do not depend on an archive.
+    """
+    meta_columns = ('mtime', 'size', 'h_off', 'h_len', 'v_off', 'v_len', 't_off', 't_len')
+    archives = None # open archives, see lookup()
+    lock = threading.Lock()
+    checked = 0 # time.monotonic() of the last look for new archives
+    generations = () # current generation folders of the open archives
+
+    def __init__(self, generation):
+        self.generation = pathlib.Path(generation)
+        with np.load(self.generation / 'meta.npz') as meta:
+            self.paths = meta['path']
+            self.meta = {column: meta[column] for column in PatternArchive.meta_columns}
+        self.rows = {path: i for i, path in enumerate(self.paths.tolist())}
+        self.cuts = PatternArchive.memmap(self.generation / 'cuts.f64', np.float64).reshape(-1, 2)
+        self.text = PatternArchive.memmap(self.generation / 'text.bin', np.uint8)
+
+    def memmap(path, dtype):
+        if os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=dtype) # np.memmap cannot map empty files
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    def folder(root):
+        """archive folder of a library root"""
+        return Settings.archive_dir / hashlib.sha1(str(root).encode()).hexdigest()[:16]
+
+    def current(folder):
+        """newest complete generation of an archive folder, None if there is none (or only the older float32 cuts.f32)"""
+        generations = sorted(p for p in pathlib.Path(folder).glob('g*') if (p / 'meta.npz').exists() and (p / 'cuts.f64').exists()) if pathlib.Path(folder).is_dir() else []
+        return generations[-1] if generations else None
+
+    def row(self, path, mtime, size):
+        """row of path if the archive has it unchanged, else None"""
+        i = self.rows.get(path)
+        if i is None or self.meta['mtime'][i] != mtime or self.meta['size'][i] != size:
+            return None
+        return i
+
+    def msi(self, i):
+        """the dict read_msi returns, with the cuts as read-only views into the archive"""
+        meta = self.meta
+        t_off = int(meta['t_off'][i])
+        text = json.loads(bytes(self.text[t_off:t_off + int(meta['t_len'][i])]).decode('utf-8'))
+        dic = {'path': str(self.paths[i]), 'vendor': text['vendor'], 'header': text['header']}
+        dic.update(text['flags'])
+        for cut, off, n in (('HORIZONTAL', 'h_off', 'h_len'), ('VERTICAL', 'v_off', 'v_len')):
+            start = int(meta[off][i])
+            dic[cut] = self.cuts[start:start + int(meta[n][i])]
+        return dic
+
+    def lookup(path, mtime, size):
+        """parsed msi of path from a compiled library, None if no archive has it unchanged"""
+        requested, path = path, os.path.abspath(path)
+        with PatternArchive.lock:
+            if PatternArchive.archives is None or time.monotonic() - PatternArchive.checked > Settings.archive_check_s:
+                PatternArchive.checked = time.monotonic()
+                PatternArchive.reload()
+            archives = PatternArchive.archives
+        for archive in archives:
+            i = archive.row(path, mtime, size)
+            if i is not None:
+                msi = archive.msi(i)
+                msi['path'] = requested # like read_msi, also the key of msi_cache
+                return msi
+        return None
+
+    def reload():
+        """open the current generations, archives that did not change are kept"""
+        folders = sorted(Settings.archive_dir.iterdir()) if Settings.archive_dir.is_dir() else []
+        generations = tuple(g for g in (PatternArchive.current(folder) for folder in folders) if g is not None)
+        if generations != PatternArchive.generations or PatternArchive.archives is None:
+            known = {archive.generation: archive for archive in PatternArchive.archives or []}
+            PatternArchive.archives = [known.get(g) or PatternArchive(g) for g in generations]
+            PatternArchive.generations = generations
+
+    def parse(path):
+        """(horizontal, vertical, text) of one file for the archive, runs in the worker processes"""
+        msi = Helper.read_msi(path)
+        flags = {key: value for key, value in msi.items() if key not in ('path', 'vendor', 'header', 'HORIZONTAL', 'VERTICAL')}
+        text = json.dumps({'vendor': msi['vendor'], 'header': msi['header'], 'flags': flags}).encode('utf-8')
+        return msi['HORIZONTAL'], msi['VERTICAL'], text
+
+
+class LibraryCompile:
+    """
+    Compiles the msi files below root into a new PatternArchive generation.
+    Files that are unchanged since the last compile are copied from the old archive,
+    the others are parsed on the process pool. The tree is listed by a ScanJob while the
+    listed files are compiled. Same use as AtollExport:
+    run() or start() and step() until it returns True, cancel() removes the new generation.
+    """
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.folder = PatternArchive.folder(self.root)
+        self.files = []
+        self.failed = [] # (file, error message)
+        self.count = 0
+        self.reused = 0
+        self.cancelled = False
+        self.pending = collections.deque() # (file, stat, future) in file order
+        self.next_file = 0
+        self.fouts = []
+
+    def start(self):
+        self.listing = ScanJob(folder_index.search_tree(self.root, FileFilter.compile('.*'), max_depth=10**6))
+        current = PatternArchive.current(self.folder)
+        self.old = PatternArchive(current) if current else None
+        self.generation = self.folder / f'g{time.time_ns()}'
+        self.generation.mkdir(parents=True)
+        (self.folder / 'root.txt').write_text(self.root, encoding='utf-8')
+        self.cuts_out = open(self.generation / 'cuts.f64', 'wb')
+        self.text_out = open(self.generation / 'text.bin', 'wb')
+        self.fouts = [self.cuts_out, self.text_out]
+        self.columns = {column: [] for column in ('path',) + PatternArchive.meta_columns}
+        self.cut_rows = 0
+        self.text_bytes = 0
+        self.executor = None # chosen when the first file is parsed
+
+    def get_executor(self):
+        if self.executor is None:
+            small = self.listing.done and len(self.files) < Settings.export_parallel_min
+            self.executor = FolderIndex.pool if small else Helper.get_process_pool()
+        return self.executor
+
+    def list_files(self):
+        """add the files the listing found since the last step"""
+        for subfolders, batch in self.listing.get_batches():
+            self.files += sorted(os.path.abspath(file_info['path']) for file_info in batch)
+        if self.listing.error:
+            self.failed.append((self.root, f'{type(self.listing.error).__name__}: {self.listing.error}'))
+            self.listing.error = None
+
+    def fill(self):
+        """copy unchanged files from the old archive, submit the others up to the export window"""
+        while self.next_file < len(self.files) and len(self.pending) < Settings.export_window and self.budget > 0:
+            file = self.files[self.next_file]
+            self.next_file += 1
+            self.budget -= 1
+            try:
+                st = os.stat(file)
+            except OSError as e:
+                self.failed.append((file, f'{type(e).__name__}: {e}'))
+                self.count += 1
+                continue
+            i = self.old.row(file, st.st_mtime_ns, st.st_size) if self.old else None
+            if i is not None:
+                old, meta = self.old, self.old.meta
+                h = old.cuts[int(meta['h_off'][i]):int(meta['h_off'][i]) + int(meta['h_len'][i])]
+                v = old.cuts[int(meta['v_off'][i]):int(meta['v_off'][i]) + int(meta['v_len'][i])]
+                text = bytes(old.text[int(meta['t_off'][i]):int(meta['t_off'][i]) + int(meta['t_len'][i])])
+                self.write(file, st, (h, v, text))
+                self.reused += 1
+                self.count += 1
+            else:
+                self.pending.append((file, st, self.get_executor().submit(PatternArchive.parse, file)))
+
+    def write(self, file, st, parsed):
+        h, v, text = parsed
+        columns = self.columns
+        columns['path'].append(file)
+        columns['mtime'].append(st.st_mtime_ns)
+        columns['size'].append(st.st_size)
+        for cut, off, n in ((h, 'h_off', 'h_len'), (v, 'v_off', 'v_len')):
+            columns[off].append(self.cut_rows)
+            columns[n].append(len(cut))
+            self.cuts_out.write(np.ascontiguousarray(cut, dtype=np.float64).tobytes())
+            self.cut_rows += len(cut)
+        columns['t_off'].append(self.text_bytes)
+        columns['t_len'].append(len(text))
+        self.text_out.write(text)
+        self.text_bytes += len(text)
+
+    def step(self, block=False):
+        """write the finished files, returns True when the archive is complete"""
+        self.list_files()
+        self.budget = Settings.compile_step_files
+        while self.pending and (block or self.pending[0][2].done()) and self.budget > 0:
+            file, st, future = self.pending.popleft()
+            try:
+                self.write(file, st, future.result())
+            except Exception as e:
+                self.failed.append((file, f'{type(e).__name__}: {e}'))
+            self.count += 1
+            self.budget -= 1
+            self.fill()
+        self.fill()
+        if self.pending or self.next_file < len(self.files):
+            return False
+        if not self.listing.done:
+            if block:
+                time.sleep(Settings.scan_poll_ms / 1000) # nothing to do until the listing finds more
+            return False
+        self.finish()
+        return True
+
+    def finish(self):
+        self.close()
+        columns = {column: np.array(values, dtype=np.int64) for column, values in self.columns.items() if column != 'path'}
+        columns['path'] = np.array(self.columns['path'], dtype=str)
+        # meta.npz is written last and marks the generation as complete
+        with open(self.generation / 'meta.tmp', 'wb') as fout:
+            np.savez(fout, **columns)
+        os.replace(self.generation / 'meta.tmp', self.generation / 'meta.npz')
+        # old generations may still be mapped by other processes, they go when they can
+        for generation in self.folder.glob('g*'):
+            if generation != self.generation:
+                shutil.rmtree(generation, ignore_errors=True)
+        PatternArchive.archives = None
+
+    def run(self):
+        self.start()
+        while not self.step(block=True):
+            pass
+        return self
+
+    def close(self):
+        for fout in self.fouts:
+            fout.close()
+        self.fouts = []
+
+    def cancel(self):
+        """stop and remove the incomplete generation, the old archive stays in use"""
+        self.cancelled = True
+        self.listing.cancel()
+        for file, st, future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        self.close()
+        shutil.rmtree(self.generation, ignore_errors=True)
+
+    def summary(self, max_failed=20):
+        lines = [f'{self.root} compiled to {self.generation}',
+                 f'{len(self.columns["path"])} of {len(self.files)} files, {self.reused} unchanged from the last compile']
+        if self.failed:
+            lines.append(f'{len(self.failed)} failed:')
+            lines += [f'{pathlib.Path(file).name}: {error}' for file, error in self.failed[:max_failed]]
+            if len(self.failed) > max_failed:
+                lines.append('...')
+        return '\n'.join(lines)
+
+# ------- Folder index -------
+class FolderIndex:
+    """
+    Persistent sqlite index of msi metadata.
+    Folder listings are reused while the folder mtime is unchanged,
+    header fields are reused while file mtime and size are unchanged.
+    Safe to use from the scan threads.
+    """
+    schema_version = 3
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=Settings.header_workers)
+    search_pool = concurrent.futures.ThreadPoolExecutor(max_workers=Settings.search_workers)
+    shallow_keys = ('path', 'file', 'antenna_name', 'freq', 'tilt', 'bandname', 'letter')
+    deep_keys = ('path', 'file', 'antenna_name', 'freq', 'tilt', 'vendor', 'gain', 'bandname', 'letter')
+    insert_shallow_sql = '''INSERT OR REPLACE INTO files
+        (path, folder, mtime, size, file, antenna_name, freq, tilt, bandname, letter)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+    def __init__(self, db_path):
+        self.db_path = pathlib.Path(db_path)
+        self.con = None
+        self.lock = threading.RLock()
+
+    def connect(self):
+        with self.lock:
+            if self.con is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self.con = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                self.con.row_factory = sqlite3.Row
+                if self.con.execute('PRAGMA user_version').fetchone()[0] != FolderIndex.schema_version:
+                    # the index is only a cache, rebuild it on schema changes
+                    self.con.executescript('DROP TABLE IF EXISTS folders; DROP TABLE IF EXISTS files;')
+                    self.con.execute(f'PRAGMA user_version={FolderIndex.schema_version}')
+                self.con.executescript('''
+                    CREATE TABLE IF NOT EXISTS folders (
+                        folder TEXT PRIMARY KEY, mtime INTEGER, subfolders TEXT);
+                    CREATE TABLE IF NOT EXISTS files (
+                        path TEXT PRIMARY KEY, folder TEXT, mtime INTEGER, size INTEGER,
+                        file TEXT, antenna_name TEXT, freq TEXT, tilt TEXT, bandname TEXT, letter TEXT,
+                        deep INTEGER DEFAULT 0, header_name TEXT, vendor TEXT, gain,
+                        hash TEXT, near_hash TEXT);
+                    CREATE INDEX IF NOT EXISTS files_folder ON files (folder);
+                ''')
+            return self.con
+
+    def shallow_row(full_path, folder, mtime, size):
+        file_info = Helper.inspect_msi(full_path, deep=False)
+        band = Helper.calc_band(file_info['freq']) if file_info['freq'].isdigit() else []
+        bandname, letter = (band[0], band[1]) if band else ('', '')
+        return (full_path, folder, mtime, size, file_info['file'], file_info['antenna_name'],
+                file_info['freq'], file_info['tilt'], bandname, letter)
+
+    def scan_folder(self, folder, batch_size=Settings.scan_batch_size):
+        """
+        Generator of (subfolders, file_infos) batches of the msi files in folder.
+        The folder is only listed with os.scandir if its mtime changed.
+        """
+        con = self.connect()
+        folder = str(folder)
+        mtime = os.stat(folder).st_mtime_ns
+        with self.lock:
+            row = con.execute('SELECT mtime, subfolders FROM folders WHERE folder=?', (folder,)).fetchone()
+            if row is not None and row['mtime'] == mtime:
+                subfolders = [p for p in row['subfolders'].split('\n') if p]
+                rows = con.execute('SELECT * FROM files WHERE folder=?', (folder,)).fetchall()
+            else:
+                rows = None
+                known = {r['path']: (r['mtime'], r['size']) for r in con.execute('SELECT path, mtime, size FROM files WHERE folder=?', (folder,))}
+
+        # unchanged folder
+        if rows is not None:
+            yield subfolders, []
+            for i in range(0, len(rows), batch_size):
+                yield [], [{key: r[key] for key in FolderIndex.shallow_keys} for r in rows[i:i + batch_size]]
+            return
+
+        # changed or new folder
+        subfolders = []
+        found = set()
+        changed = []
+        dirs = []
+        batch = []
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_dir():
+                    dirs.append(str(pathlib.Path(folder) / entry.name))
+                elif entry.name.lower().endswith('.msi') and entry.is_file():
+                    full_path = str(pathlib.Path(folder) / entry.name)
+                    st = entry.stat()
+                    found.add(full_path)
+                    if known.get(full_path) == (st.st_mtime_ns, st.st_size):
+                        batch.append(full_path)
+                    else:
+                        row = FolderIndex.shallow_row(full_path, folder, st.st_mtime_ns, st.st_size)
+                        changed.append(row)
+                        batch.append(row)
+
+                if len(batch) + len(dirs) >= batch_size:
+                    yield dirs, self.batch2infos(batch)
+                    subfolders += dirs
+                    dirs, batch = [], []
+
+        if dirs or batch:
+            yield dirs, self.batch2infos(batch)
+            subfolders += dirs
+
+        with self.lock, con:
+            con.executemany('DELETE FROM files WHERE path=?', [(p,) for p in known if p not in found])
+            con.executemany(FolderIndex.insert_shallow_sql, changed)
+            con.execute('INSERT OR REPLACE INTO folders (folder, mtime, subfolders) VALUES (?, ?, ?)', (folder, mtime, '\n'.join(subfolders)))
+
+    def snapshot(self, folder):
+        """(subfolders, {path: (mtime, size)}) of folder as last scanned, empty if it was never scanned"""
+        con = self.connect()
+        with self.lock:
+            row = con.execute('SELECT subfolders FROM folders WHERE folder=?', (folder,)).fetchone()
+            files = {r['path']: (r['mtime'], r['size']) for r in con.execute('SELECT path, mtime, size FROM files WHERE folder=?', (folder,))}
+        subfolders = {p for p in row['subfolders'].split('\n') if p} if row else set()
+        return subfolders, files
+
+    def update_folder(self, folder, mtime, subfolders, changed, removed):
+        """
+        Write the changes of a folder found by the watcher.
+        changed: {path: (mtime, size)} of new or modified files, removed: paths.
+        Returns the file infos of the changed files.
+        """
+        con = self.connect()
+        rows = [FolderIndex.shallow_row(path, folder, st[0], st[1]) for path, st in changed.items()]
+        with self.lock, con:
+            con.executemany('DELETE FROM files WHERE path=?', [(p,) for p in removed])
+            con.executemany(FolderIndex.insert_shallow_sql, rows)
+            con.execute('INSERT OR REPLACE INTO folders (folder, mtime, subfolders) VALUES (?, ?, ?)', (folder, mtime, '\n'.join(sorted(subfolders))))
+        return self.batch2infos(rows)
+
+    def batch2infos(self, batch):
+        """file infos of a scan batch, known files (paths) are taken from the index, new ones (rows) as they are"""
+        res = []
+        known = [entry for entry in batch if isinstance(entry, str)]
+        if known:
+            with self.lock:
+                rows = {}
+                for i in range(0, len(known), 500):
+                    part = known[i:i + 500]
+                    sql = f'SELECT * FROM files WHERE path IN ({",".join("?" * len(part))})'
+                    rows.update((r['path'], r) for r in self.con.execute(sql, part))
+        for entry in batch:
+            if isinstance(entry, str):
+                r = rows[entry]
+                res.append({key: r[key] for key in FolderIndex.shallow_keys})
+            else:
+                res.append(dict(zip(FolderIndex.shallow_keys, (entry[0],) + entry[4:10])))
+        return res
+
+    def search_tree(self, root, file_filter, max_depth=Settings.search_max_depth):
+        """
+        Generator of ([], matches) batches of the msi files below root that match file_filter.
+        The folders are scanned in parallel, down to max_depth levels below root.
+        Unreadable folders are skipped. Run it with a ScanJob, cancelling stops the workers.
+        A batch follows every scanned folder, empty if nothing matched, so a cancel is seen there.
+        Each folder is scanned once, symlinks or junctions to an ancestor do not loop.
+        """
+        visited = {os.path.realpath(root)}
+        pending = {} # future -> depth
+        pending[FolderIndex.search_pool.submit(self.search_folder, str(root), file_filter)] = 0
+        try:
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    depth = pending.pop(future)
+                    try:
+                        subfolders, matches = future.result()
+                    except OSError:
+                        continue
+                    if depth < max_depth:
+                        for subfolder in subfolders:
+                            real = os.path.realpath(subfolder)
+                            if real in visited:
+                                continue
+                            visited.add(real)
+                            pending[FolderIndex.search_pool.submit(self.search_folder, subfolder, file_filter)] = depth + 1
+                    yield [], matches
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def search_folder(self, folder, file_filter):
+        """(subfolders, matching file infos) of one folder"""
+        subfolders = []
+        file_infos = []
+        for dirs, batch in self.scan_folder(folder):
+            subfolders += dirs
+            file_infos += batch
+        return subfolders, file_filter.match(FileModel.add_columns(file_infos))
+
+    def fingerprints(self, paths):
+        """
+        {path: (hash, near_hash)} of the files, see Duplicates.fingerprint.
+        Known fingerprints come from the index while mtime and size of the file are unchanged,
+        the others are computed on the process pool. Files that cannot be read are left out.
+        """
+        con = self.connect()
+        stats = dict(zip(paths, FolderIndex.pool.map(FolderIndex.try_stat, paths)))
+        res = {}
+        with self.lock:
+            for i in range(0, len(paths), 500):
+                part = paths[i:i + 500]
+                sql = f'SELECT path, mtime, size, hash, near_hash FROM files WHERE hash IS NOT NULL AND path IN ({",".join("?" * len(part))})'
+                res.update((r['path'], (r['hash'], r['near_hash'])) for r in con.execute(sql, part)
+                           if stats[r['path']] == (r['mtime'], r['size']))
+
+        missing = [path for path in paths if path not in res and stats[path] is not None]
+        if missing:
+            executor = Helper.get_process_pool() if len(missing) >= Settings.export_parallel_min else FolderIndex.pool
+            new = {path: fingerprint for path, fingerprint in zip(missing, executor.map(Duplicates.fingerprint, missing, chunksize=Settings.dedup_chunk))
+                   if fingerprint is not None}
+            # a file changed in place gets its new mtime and size, its header fields are read again
+            with self.lock, con:
+                con.executemany('UPDATE files SET hash=?, near_hash=?, deep=(deep AND mtime=? AND size=?), mtime=?, size=? WHERE path=?',
+                                [(h, near) + stats[path] * 2 + (path,) for path, (h, near) in new.items()])
+            res.update(new)
+        return res
+
+    def try_stat(path):
+        """(mtime, size) of path, None if it cannot be read"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def inspect_msis(self, files, skip_errors=False):
+        """
+        like Helper.inspect_msis(files, deep=True), only new or changed files are read, in parallel.
+        With skip_errors files that cannot be read are left out instead of raising.
+        """
+        self.connect()
+        files = [full_path for full_path in files if full_path.lower().endswith('.msi')]
+        results = list(FolderIndex.pool.map(self.try_inspect_one if skip_errors else self.inspect_one, files))
+        results = [result for result in results if result is not None]
+
+        updates = [update for file_info, update in results if update]
+        if updates:
+            with self.lock, self.con:
+                self.con.executemany('''INSERT OR REPLACE INTO files
+                    (path, folder, mtime, size, file, antenna_name, freq, tilt, bandname, letter, deep, header_name, vendor, gain)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)''', updates)
+        return [file_info for file_info, update in results]
+
+    def try_inspect_one(self, full_path):
+        try:
+            return self.inspect_one(full_path)
+        except Exception:
+            return None
+
+    def inspect_one(self, full_path):
+        """deep file info of one file and the index row to write if it was read"""
+        st = os.stat(full_path)
+        with self.lock:
+            r = self.con.execute('SELECT * FROM files WHERE path=?', (full_path,)).fetchone()
+        if r and r['deep'] and r['mtime'] == st.st_mtime_ns and r['size'] == st.st_size:
+            file_info = {key: r[key] for key in FolderIndex.deep_keys}
+            file_info['antenna_name'] = r['header_name']
+            return file_info, None
+
+        file_info = Helper.inspect_msi(full_path, deep=True)
+        shallow = FolderIndex.shallow_row(full_path, str(pathlib.Path(full_path).parent), st.st_mtime_ns, st.st_size)
+        return file_info, shallow + (file_info['antenna_name'], file_info['vendor'], file_info['gain'])
+
+folder_index = FolderIndex(Settings.index_file)
+
+# ------- Folder watching -------
+class Inotify:
+    """
+    Minimal Linux inotify through ctypes.
+    Inotify.open() returns None where it is not available.
+    Network file systems are not watched, changes made by other machines raise no events there.
+    """
+    # IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF
+    mask = 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+    overflow = 0x4000 # IN_Q_OVERFLOW, events were lost
+    event = struct.Struct('iIII') # wd, mask, cookie, len, followed by the name
+    remote_types = {'cifs', 'smb3', 'smbfs', 'nfs', 'nfs4', 'afs', '9p', 'fuse.sshfs'}
+
+    def __init__(self, libc, fd):
+        self.libc = libc
+        self.fd = fd
+        self.wds = {} # folder -> watch descriptor
+        self.folders = {} # watch descriptor -> folder
+
+    def open():
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return Inotify(libc, fd) if fd >= 0 else None
+
+    def add(self, folder):
+        """watch folder, False if it cannot be watched (watch limit, network file system)"""
+        if Inotify.is_remote(folder):
+            return False
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), Inotify.mask)
+        if wd < 0:
+            return False
+        self.wds[folder] = wd
+        self.folders[wd] = folder
+        return True
+
+    def is_remote(folder):
+        """True if folder is on a network file system, by its mount in /proc/mounts"""
+        try:
+            with open('/proc/mounts', encoding='utf-8', errors='replace') as fin:
+                mounts = [line.split()[1:3] for line in fin]
+        except OSError:
+            return False
+        folder = os.path.realpath(folder)
+        best, fs_type = '', ''
+        for mount_point, mount_type in mounts:
+            mount_point = re.sub(r'\\(\d{3})', lambda m: chr(int(m.group(1), 8)), mount_point) # \040 for a space
+            inside = folder == mount_point or folder.startswith(mount_point.rstrip('/') + '/')
+            if inside and len(mount_point) >= len(best):
+                best, fs_type = mount_point, mount_type
+        return fs_type in Inotify.remote_types
+
+    def remove(self, folder):
+        wd = self.wds.pop(folder, None)
+        if wd is not None:
+            self.folders.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def wait(self, timeout):
+        """folders with events within timeout seconds, None if events were lost"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return set()
+        folders = set()
+        pos = 0
+        while pos < len(data):
+            wd, mask, cookie, length = Inotify.event.unpack_from(data, pos)
+            pos += Inotify.event.size + length
+            if mask & Inotify.overflow:
+                return None
+            if wd in self.folders:
+                folders.add(self.folders[wd])
+        return folders
+
+
+class FolderWatcher:
+    """
+    Keeps the shown folders up to date without rescanning them.
+    Uses inotify where available, else and for the folders inotify cannot watch
+    the shown folders (see show()) are listed every watch_poll_s seconds.
+    Folders that are watched but not shown are compared again when they are shown.
+    Each listing is compared with a snapshot of the folder, the changes are written to
+    the index and queued as deltas (folder, new subfolders, removed subfolders,
+    file infos of new or modified files, removed paths) for get_deltas().
+    """
+    def __init__(self, index):
+        self.index = index
+        self.snapshots = collections.OrderedDict() # folder -> (subfolders, {path: (mtime, size)}), least recently shown first
+        self.dirty = set() # folders to compare with their snapshot
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.queue = queue.Queue()
+        self.inotify = None
+        self.polled = set() # folders inotify does not watch
+        self.shown = set() # folders the gui shows, the only ones that are polled
+        self.thread = None
+
+    def watch(self, folder):
+        """watch folder, call it when a scan of folder is done"""
+        folder = str(folder)
+        with self.lock:
+            if folder in self.snapshots:
+                self.snapshots.move_to_end(folder)
+                return
+            self.snapshots[folder] = None # taken from the index by the watcher thread
+            self.dirty.add(folder)
+            while len(self.snapshots) > Settings.watch_max_folders:
+                old, _ = self.snapshots.popitem(last=False)
+                self.dirty.discard(old)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='FolderWatcher', daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def show(self, folders):
+        """set the shown folders, folders shown again are compared with their snapshot"""
+        folders = {str(folder) for folder in folders}
+        with self.lock:
+            self.dirty.update(folder for folder in folders - self.shown if folder in self.snapshots)
+            self.shown = folders
+        self.wakeup.set()
+
+    def is_watched(self, folder):
+        return str(folder) in self.snapshots
+
+    def run(self):
+        self.inotify = Inotify.open()
+        last_poll = time.monotonic()
+        while True:
+            if self.inotify:
+                changed = self.inotify.wait(Settings.watch_poll_ms / 1000)
+                if changed is not None and time.monotonic() - last_poll >= Settings.watch_poll_s:
+                    last_poll = time.monotonic()
+                    with self.lock:
+                        changed |= self.polled & self.shown
+            else:
+                # woken up for new or shown folders, else a poll of the shown folders
+                poll = not self.wakeup.wait(Settings.watch_poll_s)
+                self.wakeup.clear()
+                with self.lock:
+                    changed = self.shown.intersection(self.snapshots) if poll else set()
+
+            with self.lock:
+                folders = self.dirty.union(self.snapshots if changed is None else changed)
+                self.dirty.clear()
+            for folder in folders:
+                try:
+                    self.refresh(folder)
+                except Exception as e:
+                    print(f'watching {folder} failed: {e}', file=sys.stderr)
+
+            if self.inotify:
+                for folder in list(self.inotify.wds):
+                    if folder not in self.snapshots:
+                        self.inotify.remove(folder)
+                with self.lock:
+                    self.polled.intersection_update(self.snapshots)
+
+    def listing(folder):
+        """(folder mtime, subfolders, {path: (mtime, size)} of the msi files) of folder"""
+        mtime = os.stat(folder).st_mtime_ns # before listing, a later change gives a new mtime
+        subfolders = set()
+        files = {}
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_dir():
+                    subfolders.add(str(pathlib.Path(folder) / entry.name))
+                elif entry.name.lower().endswith('.msi') and entry.is_file():
+                    st = entry.stat()
+                    files[str(pathlib.Path(folder) / entry.name)] = (st.st_mtime_ns, st.st_size)
+        return mtime, subfolders, files
+
+    def refresh(self, folder):
+        """compare folder with its snapshot and queue the changes"""
+        with self.lock:
+            if folder not in self.snapshots:
+                return
+            snapshot = self.snapshots[folder]
+        if snapshot is None:
+            # first look, also finds the changes since the scan
+            snapshot = self.index.snapshot(folder)
+            if self.inotify and not self.inotify.add(folder):
+                self.polled.add(folder)
+
+        try:
+            mtime, subfolders, files = FolderWatcher.listing(folder)
+        except FileNotFoundError:
+            mtime, subfolders, files = None, set(), {}
+
+        with self.lock:
+            if folder not in self.snapshots:
+                return
+            if mtime is None:
+                del self.snapshots[folder]
+            else:
+                self.snapshots[folder] = (subfolders, files)
+        if (subfolders, files) == snapshot:
+            return
+
+        old_subfolders, old_files = snapshot
+        removed = [path for path in old_files if path not in files]
+        changed = {path: st for path, st in files.items() if old_files.get(path) != st}
+        for path in removed:
+            msi_cache.discard(path)
+        file_infos = self.index.update_folder(folder, mtime, subfolders, changed, removed) if mtime is not None else []
+        self.queue.put((folder, sorted(subfolders - old_subfolders), sorted(old_subfolders - subfolders), file_infos, removed))
+
+    def get_deltas(self):
+        """queued deltas without blocking"""
+        deltas = []
+        while True:
+            try:
+                deltas.append(self.queue.get_nowait())
+            except queue.Empty:
+                return deltas
+
+folder_watcher = FolderWatcher(folder_index)
+
+# ------- Background scanning -------
+class ScanJob:
+    """
+    Runs a generator of result batches on the scan thread pool.
+    The Tk loop collects the finished batches with get_batches().
+    """
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=Settings.scan_workers)
+
+    def __init__(self, batches):
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.done = False
+        self.error = None
+        self.count = 0
+        ScanJob.pool.submit(self.run, batches)
+
+    def run(self, batches):
+        try:
+            for batch in batches:
+                if self.cancelled.is_set():
+                    break
+                if batch[0] or batch[1]: # empty batches only give a chance to cancel
+                    self.queue.put(batch)
+        except Exception as e:
+            self.queue.put(e)
+        finally:
+            batches.close()
+            self.queue.put(None)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def get_batches(self):
+        """finished batches without blocking, sets done and error at the end of the scan"""
+        batches = []
+        while True:
+            try:
+                batch = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                self.done = True
+            elif isinstance(batch, Exception):
+                self.error = batch
+            else:
+                batches.append(batch)
+        return batches
+
+# ------- Atoll export -------
+class AtollExport:
+    """
+    Atoll import of many files, the rows are made on a process pool.
+    Rows are written in file order as soon as they are ready, files that fail
+    are collected in failed instead of stopping the export.
+    Use run() or start() and step() until it returns True.
+    """
+    def __init__(self, kind, files):
+        self.kind = kind
+        self.files = list(files)
+        self.failed = [] # (file, error message)
+        self.count = 0 # finished files
+        self.cancelled = False
+        self.pending = collections.deque() # (file, future) in file order
+        self.next_file = 0
+        self.fouts = []
+
+        if kind == 'passive':
+            # use folder name as antenna name
+            ant_title = pathlib.Path(self.files[0]).parent.name
+            self.dest_files = [pathlib.Path(self.files[0]).parent / f'Atoll_passive_antenna_{ant_title}.txt']
+            self.columns = [Helper.atoll_passive_columns]
+            self.task = functools.partial(Helper.passive_atoll_row, ant_title=ant_title)
+        else:
+            self.dest_files = [pathlib.Path(Settings.atoll_active_import_models), pathlib.Path(Settings.atoll_active_import_patterns)]
+            self.columns = [Helper.atoll_active_columns1, Helper.atoll_active_columns2]
+            self.task = Helper.active_atoll_rows
+
+    def get_executor(self):
+        if len(self.files) < Settings.export_parallel_min:
+            return FolderIndex.pool
+        return Helper.get_process_pool()
+
+    def start(self):
+        self.executor = self.get_executor()
+        for dest_file, columns in zip(self.dest_files, self.columns):
+            fout = open(dest_file, 'w')
+            fout.write(columns)
+            self.fouts.append(fout)
+        self.fill()
+
+    def fill(self):
+        while self.next_file < len(self.files) and len(self.pending) < Settings.export_window:
+            file = self.files[self.next_file]
+            self.next_file += 1
+            self.pending.append((file, self.executor.submit(self.task, file)))
+
+    def step(self, block=False):
+        """write the rows of the finished files, returns True when the export is complete"""
+        while self.pending and (block or self.pending[0][1].done()):
+            file, future = self.pending.popleft()
+            try:
+                rows = future.result()
+            except Exception as e:
+                self.failed.append((file, f'{type(e).__name__}: {e}'))
+            else:
+                if isinstance(rows, str):
+                    rows = (rows,)
+                for fout, row in zip(self.fouts, rows):
+                    fout.write(row)
+            self.count += 1
+            self.fill()
+
+        if self.pending:
+            return False
+        self.close()
+        return True
+
+    def run(self):
+        self.start()
+        self.step(block=True)
+        return self
+
+    def close(self):
+        for fout in self.fouts:
+            fout.close()
+        self.fouts = []
+
+    def cancel(self):
+        """stop the export and remove the incomplete files"""
+        self.cancelled = True
+        for file, future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        self.close()
+        for dest_file in self.dest_files:
+            dest_file.unlink(missing_ok=True)
+
+    def summary(self, max_failed=20):
+        lines = [f'{dest_file} created' for dest_file in self.dest_files]
+        lines.append(f'{self.count - len(self.failed)} of {len(self.files)} files exported')
+        if self.failed:
+            lines.append(f'{len(self.failed)} failed:')
+            lines += [f'{pathlib.Path(file).name}: {error}' for file, error in self.failed[:max_failed]]
+            if len(self.failed) > max_failed:
+                lines.append('...')
+        return '\n'.join(lines)
+
+# ------- Pattern comparison -------
+class PatternCompare:
+    """
+    Comparison of A files with the B files of the same antenna, frequency and tilt.
+    Both cuts of all pairs are compared as PatternGrid matrices,
+    deltas[pair, cut, angle] is the gain of B minus the gain of A (cut 0 horizontal, 1 vertical).
+    """
+    columns = ('antenna_name', 'freq', 'tilt', 'file_a', 'file_b', 'max_h', 'rms_h', 'max_v', 'rms_v', 'result', 'message')
+
+    def __init__(self, files_a, files_b, tolerance=Settings.compare_tolerance):
+        self.tolerance = tolerance
+        self.step = Settings.grid_step
+        self.angles = PatternGrid.angles(self.step)
+        self.pairs, self.missing = PatternCompare.pair(files_a, files_b)
+        self.results = [] # one dict per pair, then the files without partner
+        self.deltas = np.zeros((0, 2, len(self.angles)))
+        self.delta_rows = {} # result index -> row in deltas
+
+    def pair_key(file_info):
+        return (file_info['antenna_name'].lower(), file_info['freq'], file_info['tilt'])
+
+    def pair(files_a, files_b):
+        """
+        Pairs (path a, path b) of files with the same key, in file name order,
+        and (flag, path) of the files without partner.
+        """
+        groups = collections.defaultdict(lambda: ([], []))
+        for side, files in enumerate((files_a, files_b)):
+            for path in files:
+                file_info = Helper.inspect_msi(str(path), deep=False)
+                if file_info:
+                    groups[PatternCompare.pair_key(file_info)][side].append(str(path))
+
+        pairs = []
+        missing = []
+        for key in sorted(groups):
+            paths_a, paths_b = (sorted(paths, key=lambda path: pathlib.Path(path).name) for paths in groups[key])
+            pairs += zip(paths_a, paths_b)
+            missing += [('A', path) for path in paths_a[len(paths_b):]]
+            missing += [('B', path) for path in paths_b[len(paths_a):]]
+        return pairs, missing
+
+    def run(self):
+        msis = PatternGrid.load([path for pair in self.pairs for path in pair])
+        msis_a, msis_b = msis[0::2], msis[1::2]
+        errors = {i: msi_a if isinstance(msi_a, str) else msi_b for i, (msi_a, msi_b) in enumerate(zip(msis_a, msis_b))
+                  if isinstance(msi_a, str) or isinstance(msi_b, str)}
+
+        ok = [i for i in range(len(self.pairs)) if i not in errors]
+        self.deltas = np.stack([PatternGrid.matrix([msis_b[i] for i in ok], cut, self.step) - PatternGrid.matrix([msis_a[i] for i in ok], cut, self.step)
+                                for cut in PatternGrid.cuts], axis=1)
+        max_dev = np.abs(self.deltas).max(axis=2)
+        rms = np.sqrt((self.deltas ** 2).mean(axis=2))
+        passed = max_dev.max(axis=1) <= self.tolerance
+        stats = dict(zip(ok, zip(max_dev.round(2).tolist(), rms.round(2).tolist(), passed.tolist(), range(len(ok)))))
+
+        self.results = []
+        self.delta_rows = {}
+        for i, (path_a, path_b) in enumerate(self.pairs):
+            file_info = Helper.inspect_msi(path_a, deep=False)
+            result = {'antenna_name': file_info['antenna_name'], 'freq': file_info['freq'], 'tilt': file_info['tilt'],
+                      'file_a': pathlib.Path(path_a).name, 'file_b': pathlib.Path(path_b).name,
+                      'path_a': path_a, 'path_b': path_b,
+                      'max_h': '', 'rms_h': '', 'max_v': '', 'rms_v': '', 'message': ''}
+            if i in stats and not math.isnan(sum(stats[i][0])):
+                (result['max_h'], result['max_v']), (result['rms_h'], result['rms_v']), ok_pair, row = stats[i]
+                result['result'] = 'pass' if ok_pair else 'fail'
+                self.delta_rows[len(self.results)] = row
+            elif i in stats:
+                result['result'] = 'error'
+                result['message'] = 'cut without samples'
+            else:
+                result['result'] = 'error'
+                result['message'] = errors[i]
+            self.results.append(result)
+
+        for flag, path in self.missing:
+            file_info = Helper.inspect_msi(path, deep=False)
+            self.results.append({'antenna_name': file_info['antenna_name'], 'freq': file_info['freq'], 'tilt': file_info['tilt'],
+                                 'file_a': file_info['file'] if flag == 'A' else '', 'file_b': file_info['file'] if flag == 'B' else '',
+                                 'path_a': path if flag == 'A' else '', 'path_b': path if flag == 'B' else '',
+                                 'max_h': '', 'rms_h': '', 'max_v': '', 'rms_v': '',
+                                 'result': 'missing B' if flag == 'A' else 'missing A', 'message': ''})
+        return self
+
+    def counts(self):
+        return collections.Counter(result['result'] for result in self.results)
+
+    def summary(self):
+        counts = self.counts()
+        return (f'{len(self.pairs)} pairs: {counts["pass"]} passed, {counts["fail"]} failed, {counts["error"]} errors, '
+                f'{len(self.missing)} without partner, tolerance {self.tolerance} dB')
+
+    def write(self, dest_file):
+        with open(dest_file, 'w') as fout:
+            self.write_to(fout)
+
+    def write_to(self, fout):
+        """tab separated results"""
+        fout.write('\t'.join(PatternCompare.columns) + '\n')
+        for result in self.results:
+            fout.write('\t'.join(str(result[column]) for column in PatternCompare.columns) + '\n')
+
+# ------- Duplicates -------
+class Duplicates:
+    """
+    Duplicate patterns found by fingerprints of the parsed cuts instead of pairwise comparison.
+    hash: of the cut arrays, so file names, folders and headers do not matter.
+    near_hash: of the cuts on a grid of dedup_grid_step degrees rounded to dedup_quantum dB,
+    patterns that only differ by small deviations mostly share it.
+    Files get a 'dup' label, '=n' for the exact group n, '~n' for near group n, '' if unique.
+    """
+    def __init__(self, fingerprints):
+        self.fingerprints = fingerprints # path -> (hash, near_hash)
+        self.labels = {}
+        self.exact_groups = Duplicates.groups({path: fp[0] for path, fp in fingerprints.items()})
+        near_groups = Duplicates.groups({path: fp[1] for path, fp in fingerprints.items()})
+        # near groups that are not just one exact group
+        self.near_groups = [group for group in near_groups if len({fingerprints[path][0] for path in group}) > 1]
+
+        self.width = len(str(max(len(self.exact_groups), len(self.near_groups), 1))) # labels sort like numbers
+        for n, group in enumerate(self.near_groups, 1):
+            self.labels.update(dict.fromkeys(group, self.label('~', n)))
+        for n, group in enumerate(self.exact_groups, 1):
+            self.labels.update(dict.fromkeys(group, self.label('=', n)))
+
+    def label(self, kind, n):
+        return f'{kind}{n:0{self.width}}'
+
+    def groups(keys):
+        """lists of the paths with the same key, the biggest groups first"""
+        groups = collections.defaultdict(list)
+        for path, key in keys.items():
+            groups[key].append(path)
+        return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=lambda group: (-len(group), group[0]))
+
+    def fingerprint(path):
+        """(hash, near_hash) of the cuts of path, None if it cannot be read. Runs in the worker processes."""
+        try:
+            msi = Helper.read_msi(path)
+        except Exception:
+            return None
+        exact = hashlib.blake2b(digest_size=16)
+        near = hashlib.blake2b(digest_size=16)
+        angles = PatternGrid.angles(Settings.dedup_grid_step)
+        for cut in PatternGrid.cuts:
+            exact.update(np.ascontiguousarray(msi[cut]).tobytes())
+            exact.update(b'|')
+            quantized = np.round(PatternGrid.resample(msi[cut], angles) / Settings.dedup_quantum)
+            near.update(np.nan_to_num(quantized, nan=-1).astype(np.int32).tobytes())
+            near.update(b'|')
+        return exact.hexdigest(), near.hexdigest()
+
+    def of_files(paths):
+        return Duplicates(folder_index.fingerprints(list(paths)))
+
+    def summary(self):
+        redundant = sum(len(group) - 1 for group in self.exact_groups)
+        return (f'{len(self.fingerprints)} files: {len(self.exact_groups)} groups of identical patterns '
+                f'({redundant} redundant files), {len(self.near_groups)} groups of near duplicates')
+
+    def find_in_tree(root, max_depth=Settings.search_max_depth):
+        """
+        Generator of ([], file_infos) batches of all msi files below root like FolderIndex.search_tree,
+        at the end the files again with their 'dup' labels. Run it with a ScanJob.
+        """
+        file_infos = {}
+        for subfolders, batch in folder_index.search_tree(root, FileFilter.compile('.*'), max_depth):
+            file_infos.update((file_info['path'], file_info) for file_info in batch)
+            yield subfolders, batch
+
+        duplicates = Duplicates.of_files(file_infos)
+        yield [], [dict(file_infos[path], dup=label) for path, label in duplicates.labels.items()]
+
+# ------- File list model -------
+class FileFilter:
+    """
+    Filter of the file list: a regex matched against the filename
+    plus optional field terms like freq:1800-2100 band:D,U tilt:6 vendor:huawei hpbw_h:60-70
+    vendor: and the RfMetrics columns are read from the msi files, only for the files
+    that pass the other terms. The gui reads them in the background with read_lazy() first.
+    """
+    fields = {'freq': 'freq_num', 'tilt': 'tilt_num', 'band': 'band', 'vendor': 'vendor', **{column: column for column in RfMetrics.columns}}
+    lazy_columns = ('vendor',) + RfMetrics.columns
+    range_re = re.compile(r'(-?[\d\.]+)-(-?[\d\.]+)$')
+    special_chars = set('.^$*+?{}[]\\|()')
+
+    def __init__(self, filter_str):
+        words = []
+        self.terms = [] # (column, test value or range)
+        for word in filter_str.split():
+            key, _, value = word.partition(':')
+            if key in FileFilter.fields and value:
+                self.terms.append(FileFilter.make_term(key, value))
+            else:
+                words.append(word)
+        self.terms.sort(key=lambda term: term[0] in FileFilter.lazy_columns) # file reads last
+        self.pattern = ' '.join(words) or '.*'
+        self.regex = re.compile(self.pattern)
+
+        # a pattern without regex syntax only matches names starting with it
+        literal = self.pattern[:-2] if self.pattern.endswith('.*') else self.pattern
+        self.literal = None if FileFilter.special_chars.intersection(literal) else literal
+
+    def make_term(key, value):
+        column = FileFilter.fields[key]
+        if key == 'band':
+            return (column, set(value.upper().split(',')))
+        if key == 'vendor':
+            return (column, value.lower())
+        r = FileFilter.range_re.match(value)
+        if r:
+            return (column, (float(r.group(1)), float(r.group(2))))
+        return (column, (float(value), float(value)))
+
+    @functools.lru_cache(maxsize=100)
+    def compile(filter_str):
+        """cached FileFilter of filter_str, None if it is not valid"""
+        try:
+            return FileFilter(filter_str)
+        except (re.error, ValueError):
+            return None
+
+    def narrows(self, other):
+        """True if everything self matches is also matched by other"""
+        return (other is not None and self.literal is not None and other.literal is not None
+                and self.literal.startswith(other.literal) and self.terms == other.terms)
+
+    def match(self, records):
+        if self.pattern == '.*' and not self.terms:
+            return list(records)
+        res = self.match_name(records)
+        for column, test in self.terms:
+            res = FileFilter.match_term(res, column, test)
+        return res
+
+    def match_name(self, records):
+        matcher = self.regex.match
+        return [rec for rec in records if matcher(rec['file'])]
+
+    def match_term(records, column, test):
+        if isinstance(test, set):
+            return [rec for rec in records if rec[column] in test]
+        if isinstance(test, str):
+            FileFilter.add_vendors(records)
+            return [rec for rec in records if test in rec[column].lower()]
+        if column in RfMetrics.columns:
+            FileFilter.add_metrics(records)
+        lo, hi = test
+        return [rec for rec in records if lo <= rec[column] <= hi]
+
+    def lazy_records(self, records):
+        """records that pass the other terms but miss a column of a vendor: or metric term"""
+        columns = [column for column, test in self.terms if column in FileFilter.lazy_columns]
+        if not columns:
+            return []
+        res = self.match_name(records)
+        for column, test in self.terms:
+            if column not in FileFilter.lazy_columns:
+                res = FileFilter.match_term(res, column, test)
+        return [rec for rec in res if any(column not in rec for column in columns)]
+
+    def read_lazy(self, records):
+        """generator reading the vendor and metric columns of records in batches, run it with a ScanJob"""
+        columns = {column for column, test in self.terms if column in FileFilter.lazy_columns}
+        for i in range(0, len(records), Settings.filter_lazy_chunk):
+            batch = records[i:i + Settings.filter_lazy_chunk]
+            if 'vendor' in columns:
+                FileFilter.add_vendors(batch)
+            if columns - {'vendor'}:
+                FileFilter.add_metrics(batch)
+            yield [], batch
+
+    def add_vendors(records):
+        """vendor from the msi headers for the records without one, read once through the index"""
+        missing = [rec for rec in records if 'vendor' not in rec]
+        if missing:
+            file_infos = folder_index.inspect_msis([rec['path'] for rec in missing], skip_errors=True)
+            vendors = {file_info['path']: file_info['vendor'] for file_info in file_infos}
+            for rec in missing:
+                rec['vendor'] = vendors.get(rec['path'], '')
+
+
+    def add_metrics(records):
+        """RfMetrics columns for the records without them"""
+        missing = [rec for rec in records if 'fb' not in rec]
+        for rec, metrics in zip(missing, RfMetrics.of_files([rec['path'] for rec in missing])):
+            rec.update(metrics)
+
+
+class SortOrders:
+    """
+    Row orders of a list of records per column, computed once with typed sort keys.
+    Create a new one when the records change.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.orders = {}
+
+    def order(self, column, ascending=True):
+        """indices of the records sorted by column"""
+        if column not in self.orders:
+            keys = [Helper.sort_key(rec[column]) for rec in self.records]
+            self.orders[column] = sorted(range(len(keys)), key=keys.__getitem__)
+        order = self.orders[column]
+        return order if ascending else order[::-1]
+
+
+class FileModel:
+    """
+    File infos of the file list, indexed by path.
+    A path shown by both browsers has one record, its flag column lists the owning flags ('AB').
+    view() returns the filtered and sorted paths the list should show.
+    """
+    def __init__(self):
+        self.records = {} # path -> file info
+        self.owners = {} # path -> set of flags showing it
+        self.changed = set() # paths whose file info was replaced
+        self.selected = set() # selection of the virtual list
+        self.last_filter = None # last filter and its matches, reused to narrow the next one
+        self.last_matches = []
+        self.sort_orders = None # cached orders of all records, None after changes
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, path):
+        return path in self.records
+
+    def add(self, file_infos):
+        for file_info in FileModel.add_columns(file_infos):
+            path = file_info['path']
+            if path in self.records:
+                self.changed.add(path)
+            owners = self.owners.setdefault(path, set())
+            owners.add(file_info['flag'])
+            file_info['flag'] = ''.join(sorted(owners))
+            self.records[path] = file_info
+        self.last_filter = None
+        self.sort_orders = None
+
+    def add_columns(file_infos):
+        """precomputed columns for field filters and the band column, the bands of all files in one lookup"""
+        for file_info in file_infos:
+            file_info['freq_num'] = Helper.to_number(file_info['freq'])
+            file_info['tilt_num'] = Helper.to_number(file_info['tilt'])
+        bands = band_index.classify([file_info['freq_num'] for file_info in file_infos])
+        for file_info, i in zip(file_infos, bands.tolist()):
+            file_info['band'] = band_index.letters[i]
+            file_info.setdefault('dup', '')
+        return file_infos
+
+    def remove(self, paths, flag):
+        """flag no longer shows paths, records go when no flag shows them"""
+        for path in paths:
+            owners = self.owners.get(path)
+            if not owners or flag not in owners:
+                continue
+            owners.discard(flag)
+            if owners:
+                self.records[path]['flag'] = ''.join(sorted(owners))
+                self.changed.add(path)
+            else:
+                del self.records[path]
+                del self.owners[path]
+        self.last_filter = None
+        self.sort_orders = None
+
+    def remove_flag(self, flag):
+        self.remove([path for path, owners in self.owners.items() if flag in owners], flag)
+
+    def view(self, file_filter, sort_by, ascending):
+        if file_filter is self.last_filter:
+            filtered = self.last_matches
+        elif file_filter.narrows(self.last_filter):
+            filtered = file_filter.match(self.last_matches)
+        else:
+            filtered = file_filter.match(self.records.values())
+        self.last_filter = file_filter
+        self.last_matches = filtered
+
+        # sort by the cached order of all records
+        if self.sort_orders is None:
+            self.sort_orders = SortOrders(list(self.records.values()))
+        records = self.sort_orders.records
+        order = self.sort_orders.order(sort_by, ascending)
+        if len(filtered) == len(records):
+            return [records[i]['path'] for i in order]
+        matched = {rec['path'] for rec in filtered}
+        return [records[i]['path'] for i in order if records[i]['path'] in matched]
+
+    def diff(old, new):
+        """
+        Minimal changes to turn the row order old into new.
+        Returns (deleted, inserted, reorder), reorder is True if the kept rows change order.
+        """
+        new_set = set(new)
+        old_set = set(old)
+        deleted = [path for path in old if path not in new_set]
+        inserted = [path for path in new if path not in old_set]
+        kept_old = [path for path in old if path in new_set]
+        reorder = kept_old + inserted != new
+        return deleted, inserted, reorder
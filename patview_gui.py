@@ -0,0 +1,1242 @@
+"""
+Patview GUI: folder browsers, file list and drawing.
+"""
+import tkinter as tk
+from tkinter import ttk
+from tkinter import font
+from tkinter import simpledialog
+from tkinter import messagebox
+import pathlib
+import shutil
+import os
+import math
+import collections
+
+from patview_core import Settings, Helper, band_index, FreqHistogram, msi_cache, folder_index, folder_watcher, ScanJob, AtollExport, LibraryCompile, PatternCompare, RfMetrics, Duplicates, FileFilter, FileModel, SortOrders
+
+# ----------------------- App ---------------------------------------------
+class FolderBrowser(tk.Frame):
+    def __init__(self, parent_window, file_list, flag):
+        super().__init__(parent_window)
+        self.mainwindow = parent_window
+        self.tree = ttk.Treeview(self)
+        self.tree.pack(ipadx=100, expand=True, fill='both')
+
+        self.file_list = file_list
+        self.flag = flag
+        self.files = []
+
+        self.tree.bind('<<TreeviewOpen>>', self.add_files_and_subfolders)
+        self.tree.bind("<<TreeviewSelect>>", self.add_files_and_subfolders)
+        self.tree.bind('<Button-3>', self.on_right_click)
+
+        self.popup = tk.Menu(self, tearoff=0)
+        self.popup.add_command(label='Search subtree...', command=self.on_search)
+        self.popup.add_command(label='Find duplicates in subtree', command=self.on_find_duplicates)
+        self.tree.pack(ipadx=100, expand=True, fill='both')
+
+    def set_folder(self, folder):
+        path_parts = folder.parts
+        item = ''
+        for i in range(1, len(path_parts) + 1):
+            full_path = pathlib.Path(*path_parts[0:i])
+            if  full_path.name == '':
+                entry_text = full_path
+            else:
+                entry_text = full_path.name
+            
+            item = self.tree.insert(item, 'end', str(full_path), text=entry_text)
+            self.tree.item(item, open=True)
+
+
+    def add_files_and_subfolders(self, *args):
+        # subfolders and files are added while the folder is scanned, later changes come from the watcher
+        folder = self.tree.focus()
+        if folder:
+            self.file_list.get_files(folder, flag=self.flag, on_subfolders=self.add_subfolders)
+
+    def on_right_click(self, e):
+        item = self.tree.identify_row(e.y)
+        if item:
+            self.tree.focus(item)
+            self.popup.tk_popup(e.x_root, e.y_root)
+
+    def on_search(self):
+        folder = self.tree.focus()
+        if folder:
+            SearchDialog(self.file_list.app, self.file_list, folder, self.flag)
+
+    def on_find_duplicates(self):
+        folder = self.tree.focus()
+        if folder:
+            self.file_list.find_duplicates(folder, self.flag)
+
+    def add_subfolders(self, base, subfolders, removed=()):
+        if not self.tree.exists(base):
+            return
+        for item in subfolders:
+            if not self.tree.exists(item):
+                self.tree.insert(base, 'end', item, text=pathlib.Path(item).name)
+        for item in removed:
+            if self.tree.exists(item):
+                self.tree.delete(item)
+
+
+class FileList(tk.Frame):
+    def __init__(self, parent_window, drawing, app):
+        self.model = FileModel()
+        self.rows = [] # filtered and sorted paths
+        self.shown = [] # paths in the tree, in tree order
+        self.row_index = {} # path -> index in rows
+        self.virtual = False # only the rows in view are in the tree
+        self.first = 0 # first row in view, virtual mode
+        self.anchor = '' # start of shift selections, virtual mode
+        self.cursor = '' # last clicked row, virtual mode
+        self.parent_window = parent_window
+        self.drawing = drawing
+        self.app = app
+        self.flag = 'A'
+        self.filter = ".*"
+        self.filter_job = None # pending debounced filter
+        self.sort_order = {'#0': True, '#1': True, '#2': True, '#3': True, '#4': True, '#5': True}
+        self.scans = {} # running folder scan per flag
+        self.lazy_job = None # background read of the vendor and metric columns of the filter
+        self.lazy_filter = None
+        self.folders = {} # shown folder per flag
+        self.on_subfolders = {} # subfolder callback per flag
+        self.pending_select = '' # file to select once the scan has found it
+        self.count_filtered = 0
+        super().__init__(parent_window)
+
+        # ---Filter
+        self.filter_var = tk.StringVar(value=self.filter)
+        self.filter_var.trace_add("write", self.on_filter_change)
+        self.filter1 = tk.Entry(self, textvariable=self.filter_var)
+        self.filter1.pack(fill='x')
+
+        # ---- sort order
+        self.sort_by = 'file'
+        self.sort_asc = True
+
+        # ---- Tree---
+        self.tree = ttk.Treeview(self,  show="headings")
+        # self.tree.config(selectmode='extended')
+
+
+        self.tree.config(columns=("file", 'flag','freq', 'band', 'tilt', 'dup'))
+        self.tree.heading('file', text='file')
+        self.tree.heading('flag', text='flag')
+        self.tree.heading('freq', text='freq')
+        self.tree.heading('band', text='band')
+        self.tree.heading('tilt', text='tilt')
+        self.tree.heading('dup', text='dup')
+        
+        self.tree.column('file', width=300, anchor='w')
+        self.tree.column('flag', width=10, anchor='w')
+        self.tree.column('tilt', width=10, anchor='w')
+        self.tree.column('freq', width=20, anchor='w')
+        self.tree.column('band', width=10, anchor='w')
+        self.tree.column('dup', width=10, anchor='w')
+
+        self.tree.bind("<<TreeviewSelect>>", self.draw)
+        self.tree.bind('<Button-1>', self.on_click)
+        self.tree.bind("<Double-1>", self.on_double_click)
+
+        self.vsb = ttk.Scrollbar(self, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.vsb.set)
+        self.vsb.pack(side='right', fill='y')
+        self.tree.pack(side='left', expand=True, fill='both', ipadx=50)
+
+        # ---- virtual mode navigation
+        for key in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>',
+                    '<Shift-Up>', '<Shift-Down>', '<Shift-Prior>', '<Shift-Next>', '<Shift-Home>', '<Shift-End>'):
+            self.tree.bind(key, self.on_key)
+        self.tree.bind('<MouseWheel>', self.on_wheel)
+        self.tree.bind('<Button-4>', self.on_wheel)
+        self.tree.bind('<Button-5>', self.on_wheel)
+        self.tree.bind('<Configure>', self.on_tree_resize)
+
+        self.tree.bind("<Control-c>", self.copy_to_clipboard)
+        self.tree.bind("<Control-C>", self.copy_to_clipboard)
+        self.tree.bind("<Control-a>", self.select_all)
+        self.tree.bind("<Control-A>", self.select_all)
+
+        self.after(Settings.watch_poll_ms, self.poll_watcher)
+
+    def copy_to_clipboard(self,*args):
+        selected_items = self.get_selected()  # Get selected item ID
+        if selected_items:
+            text = '\n'.join(selected_items)  # Combine values with tabs
+            self.clipboard_clear()
+            self.clipboard_append(text)
+
+    def select_all(self, event=None):
+        if self.virtual:
+            self.model.selected = set(self.rows)
+            self.render_window()
+            self.draw()
+        else:
+            self.tree.selection_set(self.rows)
+        return "break"  # Prevent default behavior (e.g. text selection)
+    
+    def get_files(self, folder, flag, on_subfolders=None):
+        """
+        scan folder in the background, on_subfolders(folder, subfolders, removed) is called with found subfolders.
+        A folder that is already shown is kept up to date by the watcher and not scanned again.
+        """
+        folder = str(folder)
+        if (self.folders.get(flag) == folder and self.on_subfolders.get(flag) == on_subfolders
+                and (flag in self.scans or folder_watcher.is_watched(folder))):
+            return
+        self.folders[flag] = folder
+        self.on_subfolders[flag] = on_subfolders
+        folder_watcher.show(set(self.folders.values()) - {None})
+
+        # a new folder of the same browser cancels the running scan
+        if flag in self.scans:
+            self.scans[flag].cancel()
+
+        # delete files only from source FileBrowser
+        self.model.remove_flag(flag)
+        self.add_files()
+
+        job = ScanJob(folder_index.scan_folder(folder))
+        self.scans[flag] = job
+        self.poll_scan(job, folder, flag, on_subfolders)
+
+    def search(self, root, file_filter, max_depth, flag):
+        """search the subtree of root in the background, the matches replace the files of flag"""
+        return self.scan_tree(root, folder_index.search_tree(root, file_filter, max_depth), flag)
+
+    def find_duplicates(self, root, flag):
+        """all files below root replace the files of flag, duplicates get a label in the dup column"""
+        self.sort_by = 'dup'
+        self.sort_asc = True
+        return self.scan_tree(root, Duplicates.find_in_tree(root), flag)
+
+    def scan_tree(self, root, batches, flag):
+        if flag in self.scans:
+            self.scans[flag].cancel()
+        self.folders[flag] = None # no folder shown, the watcher leaves the results alone
+        self.on_subfolders[flag] = None
+        folder_watcher.show(set(self.folders.values()) - {None})
+
+        self.model.remove_flag(flag)
+        self.add_files()
+
+        job = ScanJob(batches)
+        self.scans[flag] = job
+        self.poll_scan(job, root, flag, None, watch=False)
+        return job
+
+    def on_filter_change(self, *args):
+        # filter after a typing pause
+        if self.filter_job:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(Settings.filter_delay_ms, self.apply_filter)
+
+    def apply_filter(self):
+        self.filter_job = None
+        filter = self.filter_var.get()
+        self.set_filter(filter)
+
+    def poll_scan(self, job, folder, flag, on_subfolders, watch=True):
+        if job.cancelled.is_set():
+            if self.scans.get(flag) is job:
+                del self.scans[flag]
+            return
+
+        batches = job.get_batches()
+        for subfolders, file_infos in batches:
+            if on_subfolders and subfolders:
+                on_subfolders(folder, subfolders)
+            for file_info in file_infos:
+                file_info['flag'] = flag
+            self.model.add(file_infos)
+            job.count += len(file_infos)
+
+        if batches:
+            self.add_files()
+
+        if job.error:
+            del self.scans[flag]
+            self.app.set_statusbar(f'scan of {folder} failed: {job.error}')
+        elif job.done:
+            del self.scans[flag]
+            if watch:
+                folder_watcher.watch(folder)
+            self.pending_select = ''
+            self.set_statusbar()
+        else:
+            self.app.set_statusbar(f'scanning {folder}: {job.count} files')
+            self.after(Settings.scan_poll_ms, self.poll_scan, job, folder, flag, on_subfolders, watch)
+
+    def poll_watcher(self):
+        """apply the folder changes found by the watcher to the browsers and the shown folders"""
+        modified = set()
+        deleted = set()
+        for folder, subfolders, removed_subfolders, file_infos, removed in folder_watcher.get_deltas():
+            if subfolders or removed_subfolders:
+                for on_subfolders in set(self.on_subfolders.values()) - {None}:
+                    on_subfolders(folder, subfolders, removed_subfolders)
+            for flag, shown in self.folders.items():
+                if shown == folder:
+                    self.model.add([dict(file_info, flag=flag) for file_info in file_infos])
+                    self.model.remove(removed, flag)
+                    modified.update(file_info['path'] for file_info in file_infos)
+                    deleted.update(removed)
+
+        if modified or deleted:
+            self.add_files()
+            # redraw changed files, deleted ones are dropped with the selection
+            if modified.intersection(self.drawing.files) and not deleted.intersection(self.drawing.files):
+                self.drawing.invalidate()
+                self.draw()
+        self.after(Settings.watch_poll_ms, self.poll_watcher)
+
+    def add_files(self):
+        # Apply filter
+        file_filter = FileFilter.compile(self.filter)
+        if file_filter is None:
+            return
+        if not self.read_lazy_columns(file_filter):
+            return
+
+        paths = self.model.view(file_filter, self.sort_by, self.sort_asc)
+        self.count_filtered = len(paths)
+        self.rows = paths
+        self.row_index = {path: i for i, path in enumerate(paths)}
+
+        virtual = len(paths) > Settings.virtual_list_threshold
+        if virtual != self.virtual:
+            self.set_virtual(virtual)
+
+        if self.virtual:
+            self.render_window()
+        else:
+            self.sync_tree(paths)
+
+        if self.pending_select:
+            self.select_file(self.pending_select)
+
+        self.set_statusbar()
+
+    def read_lazy_columns(self, file_filter):
+        """
+        vendor: and metric terms read the msi files, that runs in a ScanJob and the list
+        keeps its rows until it is done. True if the filter can be applied now.
+        """
+        if self.lazy_job:
+            if self.lazy_filter is file_filter:
+                return False
+            self.lazy_job.cancel()
+            self.lazy_job = None
+        missing = file_filter.lazy_records(self.model.records.values())
+        if not missing:
+            return True
+        self.lazy_filter = file_filter
+        self.lazy_job = ScanJob(file_filter.read_lazy(missing))
+        self.poll_lazy(self.lazy_job, len(missing))
+        return False
+
+    def poll_lazy(self, job, total):
+        if job is not self.lazy_job:
+            return # cancelled by another filter
+        for subfolders, records in job.get_batches():
+            job.count += len(records)
+        if job.error:
+            self.lazy_job = None
+            self.app.set_statusbar(f'reading the msi files for the filter failed: {job.error}')
+        elif job.done:
+            self.lazy_job = None
+            self.add_files()
+        else:
+            self.app.set_statusbar(f'reading the msi files for the filter: {job.count} of {total}')
+            self.after(Settings.scan_poll_ms, self.poll_lazy, job, total)
+
+    def sync_tree(self, paths):
+        """show paths in the tree with the fewest Tk calls: one delete, the new inserts, one reorder"""
+        deleted, inserted, reorder = FileModel.diff(self.shown, paths)
+        if deleted:
+            self.tree.delete(*deleted)
+        for path in self.model.changed.intersection(self.shown).difference(deleted):
+            self.tree.item(path, values=self.row_values(path))
+        self.model.changed.clear()
+        for path in inserted:
+            self.tree.insert('', 'end', iid=path, values=self.row_values(path))
+        if reorder:
+            self.tree.set_children('', *paths)
+        self.shown = paths
+
+    # ---- virtual mode
+    def set_virtual(self, virtual):
+        """switch between all rows in the tree and only the rows in view"""
+        if virtual:
+            self.model.selected = set(self.tree.selection())
+        selected = self.model.selected
+
+        self.tree.delete(*self.shown)
+        self.shown = []
+        self.first = 0
+        self.virtual = virtual
+
+        if virtual:
+            self.vsb.configure(command=self.on_vscroll)
+            self.tree.configure(yscrollcommand='')
+        else:
+            self.vsb.configure(command=self.tree.yview)
+            self.tree.configure(yscrollcommand=self.vsb.set)
+            self.sync_tree(self.rows)
+            self.tree.selection_set([path for path in self.rows if path in selected])
+
+    def rows_in_view(self):
+        rowheight = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        return max(1, self.tree.winfo_height() // rowheight)
+
+    def render_window(self):
+        """put the rows in view into the tree and show the model selection on them"""
+        n = self.rows_in_view()
+        self.first = max(0, min(self.first, len(self.rows) - n))
+        window = self.rows[self.first:self.first + n + Settings.virtual_list_buffer]
+        self.sync_tree(window)
+        self.tree.selection_set([path for path in window if path in self.model.selected])
+
+        total = len(self.rows)
+        if total:
+            self.vsb.set(self.first / total, min(self.first + n, total) / total)
+        else:
+            self.vsb.set(0, 1)
+
+    def scroll_to(self, index):
+        n = self.rows_in_view()
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + n:
+            self.first = index - n + 1
+        self.render_window()
+
+    def click_row(self, index, state):
+        """select like the Treeview does: click, Ctrl-click toggles, Shift-click selects a range"""
+        path = self.rows[index]
+        selected = self.model.selected
+        shift = state & 0x0001
+        control = state & 0x0004
+        if shift and self.anchor in self.row_index:
+            lo, hi = sorted((self.row_index[self.anchor], index))
+            if not control:
+                selected.clear()
+            selected.update(self.rows[lo:hi + 1])
+        elif control:
+            selected.symmetric_difference_update([path])
+            self.anchor = path
+        else:
+            selected.clear()
+            selected.add(path)
+            self.anchor = path
+        self.cursor = path
+        self.scroll_to(index)
+        self.draw()
+
+    def on_click(self, e):
+        if self.tree.identify_region(e.x, e.y) == 'heading':
+            self.on_header_click(e)
+            return
+        if self.virtual:
+            self.tree.focus_set()
+            # only row clicks are handled here, separators keep the column resizing of the Treeview
+            path = self.tree.identify_row(e.y)
+            if path:
+                self.click_row(self.row_index[path], e.state)
+                return "break"
+
+    def on_key(self, e):
+        if not self.virtual or not self.rows:
+            return
+        n = self.rows_in_view()
+        index = self.row_index.get(self.cursor, 0)
+        if e.keysym == 'Home':
+            index = 0
+        elif e.keysym == 'End':
+            index = len(self.rows) - 1
+        else:
+            index += {'Up': -1, 'Down': 1, 'Prior': -n, 'Next': n}[e.keysym]
+        index = max(0, min(index, len(self.rows) - 1))
+        self.click_row(index, e.state & 0x0001)
+        return "break"
+
+    def on_wheel(self, e):
+        if not self.virtual:
+            return
+        self.first += -3 if e.num == 4 or e.delta > 0 else 3
+        self.render_window()
+        return "break"
+
+    def on_vscroll(self, *args):
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            step = self.rows_in_view() if args[2] == 'pages' else 1
+            self.first += int(args[1]) * step
+        self.render_window()
+
+    def on_tree_resize(self, e):
+        if self.virtual:
+            self.render_window()
+
+    def row_values(self, path):
+        rec = self.model.records[path]
+        return (rec['file'], rec['flag'], rec['freq'], rec['band'], rec['tilt'], rec['dup'])
+
+    def set_statusbar(self):
+
+        files_all = len(self.model)
+        files_selected = len(self.get_selected())
+
+        s = f'files found:{files_all} filtered:{self.count_filtered} selected:{files_selected}'
+        self.app.set_statusbar(s)
+
+
+    def on_header_click(self,e):               
+        region = self.tree.identify_region(e.x, e.y)
+        if region == 'heading':
+            column = self.tree.identify_column(e.x)
+            new_sort_by = self.tree.heading(column)['text']
+            if new_sort_by != self.sort_by:
+                self.sort_by = new_sort_by
+            else:
+                self.sort_asc = not self.sort_asc
+            self.add_files()
+
+    def on_double_click(self, e):
+        item_id = self.tree.identify_row(e.y)
+        if not item_id.lower().endswith('.msi'):
+            os.system('"' + item_id + '"')
+
+    def select_file(self, filename):
+        if filename not in self.row_index:
+            self.pending_select = filename
+            return
+        self.pending_select = ''
+        if self.virtual:
+            self.model.selected = {filename}
+            self.anchor = self.cursor = filename
+            self.scroll_to(self.row_index[filename])
+            self.draw()
+            return
+        self.tree.selection_set(filename)  
+        self.tree.focus(filename)        
+        self.tree.see(filename)
+
+
+    def draw(self, e=None):
+        if self.virtual and e is not None:
+            return # in virtual mode the tree selection only mirrors the model
+        full_paths = self.get_selected()
+        self.drawing.draw(full_paths)
+
+        self.set_statusbar()
+
+    def set_filter(self, filter_str):
+        self.filter = filter_str
+        self.add_files()
+  
+    def get_selected(self):
+        if self.virtual:
+            return tuple(path for path in self.rows if path in self.model.selected)
+        return self.tree.selection()
+    
+class Drawing(tk.Frame):
+    def __init__(self, parent_window, app):
+        self.parent_window = parent_window
+        self.app = app
+        self.fontname = "Consolas"
+        self.fontsize = 10
+        self.padding = 0.02
+        self.files = []
+
+        super().__init__(parent_window)
+
+        # ------- Radiobuttons -----
+        self.radio_content = tk.IntVar()
+        self.radio_content.set(1) 
+        self.radio_frame = tk.Frame(self)
+        self.radio1 = tk.Radiobutton(self.radio_frame, text='patterns', variable=self.radio_content, value=1, command=self.on_radio_change)
+        self.radio1.pack(side='left')
+        self.radio2 = tk.Radiobutton(self.radio_frame, text='frequencies', variable=self.radio_content, value=2, command=self.on_radio_change)
+        self.radio2.pack(side='left')
+        self.radio2 = tk.Radiobutton(self.radio_frame, text='table', variable=self.radio_content, value=3, command=self.on_radio_change)
+        self.radio2.pack(side='left')
+        self.radio4 = tk.Radiobutton(self.radio_frame, text='compare A-B', variable=self.radio_content, value=4, command=self.on_radio_change)
+        self.radio4.pack(side='left')
+        self.density_var = tk.BooleanVar(value=False)
+        self.density = tk.Checkbutton(self.radio_frame, text='density', variable=self.density_var, command=self.on_radio_change)
+        self.density.pack(side='left')
+        self.info_label = tk.Label(self.radio_frame, anchor='w') # summary of the comparison
+        self.info_label.pack(side='left', padx=10)
+        self.radio_frame.pack(anchor='w')
+
+        self.subframe = tk.Frame(self)
+        self.subframe.pack(expand=True, fill='both')
+
+        # ----- Canvas ---
+        self.canvas = tk.Canvas(self.subframe, relief="sunken", bd=1)
+        # self.canvas.pack(expand=True, fill='both')
+        self.canvas.place(x=0, y=0, relwidth=1, relheight=1)
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<Motion>", self.on_mouse_move)
+
+
+        # ---- Treeview for table on top of canvas ----
+        self.tree = ttk.Treeview(self.subframe, show="headings")
+
+        self.tree.config(columns=("file", 'antenna_name', 'vendor','freq', 'bandname', 'letter', 'tilt', 'gain') + RfMetrics.columns)
+        self.tree.heading("file", text="file")
+        self.tree.heading("antenna_name", text="antenna_name")
+        self.tree.heading("vendor", text="vendor")
+        self.tree.heading("freq", text="freq")
+        self.tree.heading("bandname", text="bandname")
+        self.tree.heading("letter", text="letter")
+        self.tree.heading("tilt", text="tilt")
+        self.tree.heading("gain", text="gain")
+
+        self.tree.column('file', width=100, anchor='w')
+        self.tree.column('antenna_name', width=200, anchor='w')
+        self.tree.column('vendor', width=50, anchor='w')
+        self.tree.column('freq', width=10, anchor='w')
+        self.tree.column('bandname', width=10, anchor='w')
+        self.tree.column('letter', width=10, anchor='w')
+        self.tree.column('tilt', width=10, anchor='w')
+        self.tree.column('gain', width=10, anchor='w')
+        for column in RfMetrics.columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=10, anchor='w')
+
+        self.tree.place(x=0, y=0, relwidth=1, relheight=1)
+        self.tree.bind('<Button-1>', self.on_header_click)
+        self.sort_by = 'file'
+        self.sort_ascending = True
+
+        # ---- Treeview for the A-B comparison ----
+        self.compare_tree = ttk.Treeview(self.subframe, show="headings", columns=PatternCompare.columns)
+        for column in PatternCompare.columns:
+            self.compare_tree.heading(column, text=column)
+            self.compare_tree.column(column, width=150 if column.startswith('file') else 40, anchor='w')
+        self.compare_tree.tag_configure('fail', foreground='#f00')
+        self.compare_tree.tag_configure('error', foreground='#f00')
+        self.compare_tree.tag_configure('missing', foreground='#990')
+        self.compare_tree.bind('<Button-1>', self.on_compare_header_click)
+        self.compare_sort_by = 'result'
+        self.compare_ascending = True
+
+        # ---- retained canvas scene
+        self.scene_key = None # (view, files) the canvas items were made for
+        self.scene_width = 0 # width the canvas items are laid out for
+        self.scene_lines = [] # (text item, row) of the header lines
+        self.scene_raster = None # cuts of a rasterized scene, drawn again on resize
+        self.raster_image = None # keeps the PhotoImage alive
+        self.scene_polygons = [] # (polygon item, cut, x center / width) of the drawn cuts
+        self.scene_buckets = 0 # level of detail the polygons are drawn with
+        self.lod_cache = collections.OrderedDict() # (id(cut), buckets) -> (cut, decimated cut), least recently used first
+        self.lod_cache_entries = Settings.lod_cache_entries # grows to hold all cuts of a rasterized scene
+        self.resize_pending = False
+
+        # ---- cached table content
+        self.table_files = None # files the table rows were made for
+        self.table_infos = []
+        self.table_orders = SortOrders([])
+        self.compare_files = None # files the comparison was made for
+        self.compare = None
+        self.compare_orders = SortOrders([])
+
+        # ---- frequencies of the frequency view
+        self.freq_files = None # files the frequencies were read for
+        self.freqs = []
+        self.freq_hist = None
+        self.freq_info = '' # file counts shown next to the radio buttons
+
+
+    def on_radio_change(self, *args):
+        self.draw()
+      
+
+    def on_resize(self, e):
+        # one redraw per idle cycle, however many Configure events arrive
+        if not self.resize_pending:
+            self.resize_pending = True
+            self.after_idle(self.on_resize_idle)
+
+    def on_resize_idle(self):
+        self.resize_pending = False
+        self.draw()
+
+    def on_mouse_move(self, e):
+        radio_selected = self.radio_content.get()
+        if radio_selected == 2:
+            f = self.unscale(e.x)
+            n = self.freq_hist.count_at(f) if self.freq_hist else 0
+            self.app.set_statusbar(f'{int(f)} MHz, {n} files')
+
+    def on_header_click(self,e):               
+        region = self.tree.identify_region(e.x, e.y)
+        if region == 'heading':
+            column = self.tree.identify_column(e.x)
+            new_sort_by = self.tree.heading(column)['text']
+            if new_sort_by != self.sort_by:
+                self.sort_by = new_sort_by
+            else:
+                self.sort_ascending = not self.sort_ascending
+            self.draw3()
+
+    def on_compare_header_click(self, e):
+        if self.compare_tree.identify_region(e.x, e.y) == 'heading':
+            column = self.compare_tree.heading(self.compare_tree.identify_column(e.x))['text']
+            if column != self.compare_sort_by:
+                self.compare_sort_by = column
+            else:
+                self.compare_ascending = not self.compare_ascending
+            self.sort_compare()
+
+
+    def draw_circle(self, center_x, center_y, radius, **kwargs):
+        x0 = center_x - radius
+        y0 = center_y - radius
+        x1 = center_x + radius
+        y1 = center_y + radius
+        return self.canvas.create_oval(x0, y0, x1, y1, **kwargs)
+
+    def draw_axis(self):
+        w = self.winfo_width()
+        a = self.padding * w
+
+        # text
+        padding = 0.007
+        self.canvas.create_text( (0.0 + padding) * w, padding  * w, text="Horizontal", font=("Consolas", int(0.02 * w)), fill="#bbb", anchor='nw', tags='title')
+        self.canvas.create_text( (0.5 + padding )* w, padding  * w, text="Vertical",   font=("Consolas", int(0.02 * w)), fill="#bbb", anchor='nw', tags='title')
+
+        x0, y0 = w/4, w/4
+        r = w/4 - a
+        for n in range(1, 4):
+            self.draw_circle(x0, y0, r/3 * n, outline="#aaa",dash=(1, 3))
+        self.draw_circle(x0, y0, 0.9 * r, outline="#aaa",dash=(1,1)) # 3dB
+
+        x0, y0 = w*3/4, w/4
+        r = w/4 - a
+        for n in range(1, 4):
+            self.draw_circle(x0, y0, r/3 * n, outline="#aaa",dash=(1, 3))
+        self.draw_circle(x0, y0, 0.9 * r, outline="#aaa",dash=(1,1)) # 3dB
+
+        # axis
+        self.canvas.create_line(a, w/4, w/2 -a, w/4, fill='#aaa',dash=(1, 3))
+        self.canvas.create_line(w/4, a, w/4, w/2-a, fill='#aaa',dash=(1, 3))
+
+        self.canvas.create_line(w/2+a, w/4, w/2+w/2 -a, w/4, fill='#aaa',dash=(1, 3))
+        self.canvas.create_line(w/2+w/4, a, w/2+w/4, w/2-a, fill='#aaa',dash=(1, 3))
+
+    def draw(self, files=None):  
+        if files:
+            self.files = files
+        radio_selected = self.radio_content.get()
+        if radio_selected == 3:
+            self.draw3()
+            return
+        if radio_selected == 4:
+            self.draw4()
+            return
+        self.info_label.config(text=self.freq_info if radio_selected == 2 else '')
+
+        self.tree.place_forget()
+        self.compare_tree.place_forget()
+        self.canvas.place(x=0, y=0, relwidth=1, relheight=1)
+
+        # canvas items are only rebuilt for a new selection or view, else moved to the new size
+        scene_key = (radio_selected, tuple(self.files), self.density_var.get())
+        if scene_key != self.scene_key or self.scene_width < 50:
+            self.scene_key = scene_key
+            self.scene_width = self.winfo_width()
+            self.scene_lines = []
+            self.scene_raster = None
+            self.scene_polygons = []
+            self.scene_buckets = Helper.lod_buckets(self.scene_width/4 - self.padding * self.scene_width)
+            if radio_selected == 1:
+                self.draw1()
+            else:
+                self.draw2()
+        else:
+            self.update_scene()
+
+    def update_scene(self):
+        """fit the existing canvas items to the current width"""
+        w = self.winfo_width()
+        if w == self.scene_width:
+            return
+
+        if self.scene_key[0] == 1:
+            f = w / self.scene_width
+            self.canvas.scale('all', 0, 0, f, f)
+            self.canvas.itemconfigure('title', font=("Consolas", int(0.02 * w)))
+            for item, row in self.scene_lines:
+                self.canvas.coords(item, 10, w/2 + row * self.fontsize * 1.5)
+            if self.scene_raster is not None:
+                self.draw_raster(self.scene_raster)
+
+            # other level of detail for the new size
+            r0 = w/4 - self.padding * w
+            buckets = Helper.lod_buckets(r0)
+            if buckets != self.scene_buckets:
+                self.scene_buckets = buckets
+                for item, cut, x_rel in self.scene_polygons:
+                    self.canvas.coords(item, Helper.cut2canvas(self.lod(cut, r0), x_rel * w, w/4, r0))
+        else:
+            # the bins are pixel columns, the cached frequencies are binned again for the new width
+            self.draw2()
+
+        self.scene_width = w
+
+    def draw1(self):
+        self.canvas.delete("all")
+        self.draw_axis()
+        self.draw_diagrams()
+
+    def draw2(self):
+        self.canvas.delete("all")
+
+
+        def rect(band, color, light_color):
+            bandname, letter, fmin_sr, fmax_sr, fmin_all, fmax_all, hsl = band
+            bandname = str(int(bandname)) # delete leading zero because of space
+
+            # create band for all operators
+            self.canvas.create_rectangle(self.scale(fmin_all),80, self.scale(fmax_all), 120, width=0.1, fill=light_color, outline="")
+            # creat sunrise bands 
+            self.canvas.create_rectangle(self.scale(fmin_sr),85, self.scale(fmax_sr), 115, width=0.1, fill=color, outline="")
+
+            # create text
+            self.canvas.create_text(self.scale(fmin_sr), 20, text=letter, font=("Consolas", 9), fill=color, anchor='nw')
+            self.canvas.create_text(self.scale(fmin_sr), 40, text=bandname, font=("Consolas", 9), fill=color, anchor='nw')
+
+
+        for band, color, light_color in zip(band_index.bands, band_index.colors, band_index.light_colors):
+            rect(band, color, light_color)
+
+        # create standard freqs
+        for f in Settings.std_freqs:
+            x0 = self.scale(f)
+            y0 = 130
+            x1 = x0
+            y1 = 150
+
+            self.canvas.create_line(x0, y0, x1, y1, fill="#aaa")
+
+
+        # one line per pixel column, its height grows with the number of files there
+        files = tuple(self.files)
+        if files != self.freq_files:
+            self.freq_files = files
+            records = self.app.file_table.model.records
+            missing = [path for path in files if path not in records]
+            file_infos = [records[path] for path in files if path in records] + Helper.inspect_msis(missing, deep=False)
+            self.freqs = [file_info.get('freq_num', Helper.to_number(file_info['freq'])) for file_info in file_infos]
+        space = 10
+        fmin, fmax = Settings.freq_axis
+        self.freq_hist = hist = FreqHistogram(self.freqs, fmin, fmax, max(self.winfo_width() - 2 * space, 1))
+        top = max(int(hist.counts.max(initial=0)), 1)
+        for i in hist.counts.nonzero()[0].tolist():
+            x = space + i + 0.5
+            self.canvas.create_line(x, 120 - 50 * hist.counts[i] / top, x, 130)
+
+        for band, color, n in zip(band_index.bands, band_index.colors, hist.band_counts.tolist()):
+            if n:
+                self.canvas.create_text(self.scale(band[2]), 55, text=str(n), font=("Consolas", 9), fill=color, anchor='nw')
+
+        info = f'{len(self.freqs)} files'
+        if hist.unknown or hist.outside:
+            info += f', {hist.unknown} without frequency, {hist.outside} outside {fmin}..{fmax} MHz'
+        self.freq_info = info
+        self.info_label.config(text=info)
+
+    def draw3(self):
+        self.canvas.place_forget()
+        self.compare_tree.place_forget()
+        self.info_label.config(text='')
+        self.tree.place(x=0, y=0, relwidth=1, relheight=1)
+
+        # metadata is read once per selection, sorting only reorders the rows
+        files = tuple(self.files)
+        if files != self.table_files:
+            self.table_files = files
+            self.table_infos = folder_index.inspect_msis(files)
+            for entry, metrics in zip(self.table_infos, RfMetrics.of_files([entry['path'] for entry in self.table_infos])):
+                entry.update((column, '' if math.isnan(value) else value) for column, value in metrics.items())
+            self.table_orders = SortOrders(self.table_infos)
+
+            self.tree.delete(*self.tree.get_children())
+            for entry in self.table_infos:
+                self.tree.insert("", "end", iid=entry['path'], values=(entry['file'], entry['antenna_name'], entry['vendor'], entry['freq'], entry['bandname'], entry['letter'], entry['tilt'], entry['gain'])
+                                 + tuple(entry[column] for column in RfMetrics.columns))
+
+        self.sort_table()
+
+    def draw4(self):
+        self.canvas.place_forget()
+        self.tree.place_forget()
+        self.compare_tree.place(x=0, y=0, relwidth=1, relheight=1)
+
+        # the selected A files are compared with the selected B files once per selection
+        files = tuple(self.files)
+        if files != self.compare_files:
+            self.compare_files = files
+            records = self.app.file_table.model.records
+            files_a = [path for path in files if path in records and 'A' in records[path]['flag']]
+            files_b = [path for path in files if path in records and 'B' in records[path]['flag']]
+            self.compare = PatternCompare(files_a, files_b).run()
+            self.compare_orders = SortOrders(self.compare.results)
+
+            self.compare_tree.delete(*self.compare_tree.get_children())
+            for i, result in enumerate(self.compare.results):
+                tag = result['result'].split()[0]
+                self.compare_tree.insert('', 'end', iid=str(i), values=[result[column] for column in PatternCompare.columns], tags=(tag,))
+
+        self.sort_compare()
+        self.info_label.config(text=self.compare.summary())
+
+    def sort_compare(self):
+        order = self.compare_orders.order(self.compare_sort_by, self.compare_ascending)
+        for index, i in enumerate(order):
+            self.compare_tree.move(str(i), '', index)
+
+    def sort_table(self):
+        order = self.table_orders.order(self.sort_by, self.sort_ascending)
+        for index, i in enumerate(order):
+            self.tree.move(self.table_infos[i]['path'], '', index)
+    
+    def scale(self, f):
+        w = self.winfo_width()
+        h = self.winfo_height()
+        fmin, fmax = Settings.freq_axis
+        space = 10
+        x = (f - fmin) / (fmax - fmin) * (w - 2 * space) + space
+        return x
+    
+    def unscale(self, x):
+        w = self.winfo_width()
+        h = self.winfo_height()
+        fmin, fmax = Settings.freq_axis
+        space = 10
+        f = (fmax - fmin) * (x - space) / (w - 2 * space) + fmin
+        return f
+
+    def draw_diagrams(self):
+            pattern_colors = Settings.pattern_colors
+           
+            w = self.winfo_width()
+            a = self.padding * w
+
+            files = [f for f in self.files if pathlib.Path(f).suffix.lower() == '.msi']
+            msis = Helper.load_msis(files)
+
+            # many patterns or the density view go into one image instead of canvas polygons
+            if len(files) > Settings.max_vector_patterns or self.density_var.get():
+                self.scene_raster = msis
+                self.draw_raster(msis)
+                if len(files) > Settings.max_vector_patterns:
+                    files = files[0:Settings.max_vector_patterns]
+                    self.app.set_statusbar(f"Text lines limited to {Settings.max_vector_patterns}")
+
+            for i, msi_file in enumerate(files):
+                    color = pattern_colors[i % len(pattern_colors)]
+                    msi = msis[i]
+                    # draw pattern
+                    if self.scene_raster is None:
+                        self.draw_pattern(msi, color)
+
+                    # lines for one pattern
+                    header = msi['header']
+                    if len(files) <= 1: 
+                        for k, line in enumerate(header):
+                            line = line.strip()
+                            if k==0:
+                                my_font = font.Font(family=self.fontname, size=self.fontsize, weight="bold")
+                            else:
+                                my_font = (self.fontname, self.fontsize)
+                            item = self.canvas.create_text(10, w/2 + k * self.fontsize * 1.5, text=line, fill=color, font=my_font, anchor='nw')
+                            self.scene_lines.append((item, k))
+
+                    # show 1 line for one paattern
+                    else:
+                        text = msi_file
+                        for k, line in enumerate(header):
+                            line = line.strip('\n').strip()
+                            if len(line) > 0:
+                                text = text + '|' + line.strip()
+                        item = self.canvas.create_text(10, w/2 + i * self.fontsize * 1.5, text=text, fill=color, font=(self.fontname, self.fontsize), anchor='nw')
+                        self.scene_lines.append((item, i))
+
+    def draw_raster(self, msis):
+        """draw all cuts of msis as one image below the axis"""
+        w = self.winfo_width()
+        r0 = w/4 - self.padding * w
+        # every cut of the scene stays cached, a resize does not decimate them again
+        self.lod_cache_entries = max(self.lod_cache_entries, 2 * len(msis) + Settings.max_vector_patterns)
+        polygons = [Helper.cut2xy(self.lod(msi['HORIZONTAL'], r0), w/4, w/4, r0) for msi in msis]
+        polygons += [Helper.cut2xy(self.lod(msi['VERTICAL'], r0), w*3/4, w/4, r0) for msi in msis]
+        counts = Helper.rasterize(polygons, w, max(int(w/2), 1))
+
+        background = tuple(c // 256 for c in self.winfo_rgb(self.canvas.cget('bg')))
+        self.raster_image = tk.PhotoImage(data=Helper.raster2ppm(counts, background, self.density_var.get()), format='PPM')
+        self.canvas.delete('raster')
+        self.canvas.create_image(0, 0, image=self.raster_image, anchor='nw', tags='raster')
+        self.canvas.tag_lower('raster')
+
+    def set_files(self, files):
+        self.files = files
+
+    def invalidate(self):
+        """rebuild the view on the next draw, the shown files changed on disk"""
+        self.scene_key = None
+        self.table_files = None
+        self.compare_files = None
+
+    def draw_pattern(self, dic, color):
+
+        w = self.winfo_width()
+        a = self.padding * w
+        r0 = w/4 - a
+
+        for cut, x_rel in (('HORIZONTAL', 1/4), ('VERTICAL', 3/4)):
+            coords = Helper.cut2canvas(self.lod(dic[cut], r0), x_rel * w, w/4, r0)
+            if len(coords) >= 4:
+                item = self.canvas.create_polygon(coords, fill='', outline=color)
+                self.scene_polygons.append((item, dic[cut], x_rel))
+
+    def lod(self, cut, r0):
+        """cut decimated to the resolution of a polar plot with radius r0, cached"""
+        buckets = Helper.lod_buckets(r0)
+        key = (id(cut), buckets)
+        if key in self.lod_cache:
+            self.lod_cache.move_to_end(key)
+        else:
+            while len(self.lod_cache) >= self.lod_cache_entries:
+                self.lod_cache.popitem(last=False)
+            self.lod_cache[key] = (cut, Helper.decimate_cut(cut, buckets)) # cut keeps its id valid
+        return self.lod_cache[key][1]
+
+class ExportDialog(tk.Toplevel):
+    """progress of an AtollExport or LibraryCompile with cancel, shows a summary at the end"""
+    def __init__(self, app, export, title='Make Atoll Pattern'):
+        super().__init__(app)
+        self.title(title)
+        self.transient(app)
+        self.export = export
+        self.name = title
+
+        self.label = tk.Label(self, anchor='w', width=50)
+        self.label.pack(fill='x', padx=10, pady=5)
+        self.progress = ttk.Progressbar(self, length=300)
+        self.progress.pack(fill='x', padx=10)
+        tk.Button(self, text='Cancel', command=self.on_cancel).pack(pady=5)
+        self.protocol('WM_DELETE_WINDOW', self.on_cancel)
+
+        export.start()
+        self.poll()
+
+    def poll(self):
+        if self.export.cancelled:
+            return
+        finished = self.export.step()
+        self.progress.config(maximum=max(len(self.export.files), 1), value=self.export.count) # a compile finds its files while it runs
+        self.label.config(text=f'{self.export.count} of {len(self.export.files)} files, {len(self.export.failed)} failed')
+        if finished:
+            self.destroy()
+            messagebox.showinfo(self.name, self.export.summary())
+        else:
+            self.after(Settings.scan_poll_ms, self.poll)
+
+    def on_cancel(self):
+        self.export.cancel()
+        self.destroy()
+        messagebox.showinfo(self.name, f'Cancelled after {self.export.count} of {len(self.export.files)} files')
+
+class SearchDialog(tk.Toplevel):
+    """recursive search below a folder, the matches are streamed into the file list"""
+    def __init__(self, app, file_list, folder, flag):
+        super().__init__(app)
+        self.title('Search subtree')
+        self.transient(app)
+        self.file_list = file_list
+        self.folder = folder
+        self.flag = flag
+        self.job = None
+
+        tk.Label(self, text=f'Search below {folder}', anchor='w').pack(fill='x', padx=10, pady=5)
+        self.filter_var = tk.StringVar(value='' if file_list.filter == '.*' else file_list.filter)
+        self.entry = tk.Entry(self, textvariable=self.filter_var, width=50)
+        self.entry.pack(fill='x', padx=10)
+        self.entry.bind('<Return>', self.on_search)
+        self.entry.focus_set()
+
+        frame = tk.Frame(self)
+        tk.Label(frame, text='depth').pack(side='left')
+        self.depth_var = tk.StringVar(value=str(Settings.search_max_depth))
+        tk.Spinbox(frame, from_=0, to=99, width=4, textvariable=self.depth_var).pack(side='left')
+        tk.Button(frame, text='Search', command=self.on_search).pack(side='left', padx=10)
+        self.cancel_button = tk.Button(frame, text='Cancel', command=self.on_cancel)
+        self.cancel_button.pack(side='left')
+        frame.pack(anchor='w', padx=10, pady=5)
+
+        self.label = tk.Label(self, text='regex and freq: tilt: band: vendor: terms', anchor='w')
+        self.label.pack(fill='x', padx=10, pady=5)
+        self.protocol('WM_DELETE_WINDOW', self.on_cancel)
+
+    def on_search(self, *args):
+        file_filter = FileFilter.compile(self.filter_var.get().strip() or '.*')
+        if file_filter is None:
+            self.label.config(text='invalid filter')
+            return
+        try:
+            max_depth = int(self.depth_var.get())
+        except ValueError:
+            self.label.config(text='invalid depth')
+            return
+        if self.job:
+            self.job.cancel()
+        self.job = self.file_list.search(self.folder, file_filter, max_depth, self.flag)
+        self.cancel_button.config(text='Cancel')
+        self.poll(self.job)
+
+    def poll(self, job):
+        if job is not self.job or job.cancelled.is_set():
+            return
+        if job.done or job.error:
+            self.label.config(text=f'{job.count} files found' + (f', {job.error}' if job.error else ''))
+            self.cancel_button.config(text='Close')
+        else:
+            self.label.config(text=f'searching: {job.count} files found')
+            self.after(Settings.scan_poll_ms, self.poll, job)
+
+    def on_cancel(self):
+        if self.job and not self.job.done:
+            self.job.cancel()
+        self.destroy()
+
+# ------------------- APP -------------------------------
+class App(tk.Tk):
+    def __init__(self, start_msi):
+
+        # ------ start argument ------
+        self.start_msi = start_msi
+
+        if start_msi != '':
+            self.root_folder = pathlib.Path(start_msi).parent
+        else:
+            self.root_folder = pathlib.Path('.').resolve()
+
+        # ---- Settings ----
+        self.start_geometry='1200x500'
+
+        # ---- start tkinter ----
+        super().__init__()
+        self.title('Patview')
+        self.geometry(self.start_geometry)
+
+        # ------ Menue -----
+        self.menu_bar = tk.Menu(self)
+        file_menu = tk.Menu(self.menu_bar, tearoff=0)
+        file_menu.add_command(label="Copy pattern", command=self.on_copy_pattern)
+        file_menu.add_command(label="Make passive Atoll import", command=self.on_make_passive_atoll)
+        file_menu.add_command(label="Make active Atoll import", command=self.on_make_active_atoll)
+        file_menu.add_command(label="Export A-B comparison", command=self.on_export_compare)
+        file_menu.add_command(label="Search subtree...", command=self.on_search)
+        file_menu.add_command(label="Compile library", command=self.on_compile_library)
+        file_menu.add_command(label="Cache info", command=self.on_cache_info)
+
+
+        self.menu_bar.add_cascade(label="Action", menu=file_menu)
+
+        # Attach the menu bar to the window
+        self.config(menu=self.menu_bar)
+
+        # ------ status bar -------
+        self.status_var = tk.StringVar()
+        self.status_var.set("Ready")  # Initial status message
+
+        self.status_bar = tk.Label(self, textvariable=self.status_var, relief=tk.SUNKEN, anchor='w')
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+
+
+        # ------ Main Paned Window ------
+        self.pw_main = tk.PanedWindow(self, orient="horizontal")
+        self.pw_main.pack(expand=True, fill='both' )
+
+        # ------ Sub Paned Windows ------
+        self.pw1 = ttk.PanedWindow(self.pw_main)
+        self.pw_main.add(self.pw1)
+
+        self.pw2 = ttk.PanedWindow(self.pw_main)
+        self.pw_main.add(self.pw2)
+
+        self.pw3 = ttk.PanedWindow(self.pw_main)
+        self.pw_main.add(self.pw3)
+        
+        # ---------- Drawing ----------
+        self.drawing = Drawing(self.pw3, self)
+
+        # ----------- Filelist ---------
+        self.file_table = FileList(self.pw2, self.drawing, self)
+
+        # --------- Double Browser -------------------
+        self.browser1 = FolderBrowser(self.pw1, self.file_table, flag='A')
+        self.browser1.set_folder(self.root_folder)
+
+        self.browser2 = FolderBrowser(self.pw1, self.file_table, flag='B')
+        self.browser2.set_folder(self.root_folder)
+
+
+        # ---- Add to Panes ------
+        self.pw1.add(self.browser1)
+        self.pw1.add(self.browser2)
+        self.pw2.add(self.file_table)
+        self.pw3.add(self.drawing)
+
+
+        # -------- initial drawing --------
+        self.file_table.get_files(self.root_folder, 'A')
+        self.file_table.select_file(self.start_msi)
+
+
+    def set_statusbar(self, s):
+        self.status_var.set(s)
+
+    def on_copy_pattern(self, *args):
+        files = self.file_table.get_selected()
+        for file in files:
+            shutil.copy(file, 'C:/test')
+        messagebox.showinfo('Copy pattern', f'{len(files)} copied to C:/test')
+
+    def on_make_passive_atoll(self, *args):
+        files = self.file_table.get_selected()
+        if files:
+            ExportDialog(self, AtollExport('passive', files))
+
+    def on_make_active_atoll(self, *args):
+        files = self.file_table.get_selected()
+        if files:
+            ExportDialog(self, AtollExport('active', files))
+
+    def on_export_compare(self, *args):
+        compare = self.drawing.compare
+        if compare is None:
+            messagebox.showinfo('Export A-B comparison', 'Select A and B files and show the compare A-B view first')
+            return
+        compare.write(Settings.compare_export_file)
+        messagebox.showinfo('Export A-B comparison', f'{Settings.compare_export_file} created\n{compare.summary()}')
+
+    def on_search(self, *args):
+        folder = self.browser1.tree.focus() or str(self.root_folder)
+        SearchDialog(self, self.file_table, folder, 'A')
+
+    def on_compile_library(self, *args):
+        folder = self.browser1.tree.focus() or str(self.root_folder)
+        ExportDialog(self, LibraryCompile(folder), 'Compile library')
+
+    def on_cache_info(self, *args):
+        messagebox.showinfo('Cache info', msi_cache.stats())